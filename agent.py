@@ -179,7 +179,7 @@ class AITaskPlanningAgent:
         """
         print(f"\n📅 Executing plan - scheduling {len(plan.scheduled_tasks)} tasks...")
 
-        created_events = []
+        scheduled = []
 
         for scheduled_task in plan.scheduled_tasks:
             task_id = scheduled_task['task_id']
@@ -198,26 +198,37 @@ class AITaskPlanningAgent:
                 event_type="scheduled_task",
                 task_id=task.id
             )
+            scheduled.append((task, event))
 
-            # Save to database
-            event = self.db.save_event(event)
-
-            # Sync to external calendar
-            try:
-                event = self.calendar_service.create_event(event)
-                self.db.save_event(event)  # Update with calendar_id
-                print(f"  ✓ Scheduled: {task.title} ({scheduled_task['scheduled_start']})")
-            except Exception as e:
-                print(f"  ⚠️  Failed to sync {task.title} to calendar: {e}")
-
-            # Update task status
+        # Save to database
+        created_events = self.db.save_events([event for _, event in scheduled])
+
+        # Sync to external calendar in one batched call; failed events come back unsynced
+        sync_unavailable = False
+        try:
+            created_events = self.calendar_service.create_events_bulk(created_events)
+        except Exception as e:
+            sync_unavailable = True
+            print(f"  ⚠️  Failed to sync events to calendar: {e}")
+
+        # Update with calendar_id, including events synced before any failure
+        self.db.save_events(created_events)
+        for (task, _), event in zip(scheduled, created_events):
+            if event.synced:
+                print(f"  ✓ Scheduled: {task.title} ({event.start_time.isoformat()})")
+            elif sync_unavailable:
+                # The whole sync failed and was reported once above
+                print(f"  ✓ Saved locally: {task.title} ({event.start_time.isoformat()})")
+            else:
+                print(f"  ⚠️  Failed to sync {task.title} to calendar")
+
+        # Update task status
+        for task, event in scheduled:
             task.status = TaskStatus.SCHEDULED
             task.scheduled_start = event.start_time
             task.scheduled_end = event.end_time
             self.db.save_task(task)
 
-            created_events.append(event)
-
         print(f"\n✓ Plan executed - {len(created_events)} tasks scheduled on calendar")
         return created_events
 
@@ -367,7 +378,11 @@ class AITaskPlanningAgent:
 
     def get_insights(self) -> Dict[str, Any]:
         """Get insights about learned preferences and patterns."""
-        return self.preference_learner.generate_insights_report(self.user_profile)
+        insights = self.preference_learner.generate_insights_report(self.user_profile)
+        insights['completion_deviations'] = self.preference_learner.summarize_completions(
+            self.db.get_all_tasks(status="completed")
+        )
+        return insights
 
     def list_tasks(self, status: str = None) -> List[Task]:
         """
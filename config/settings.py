@@ -1,7 +1,7 @@
 """Application configuration and settings."""
 
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -16,6 +16,7 @@ class Settings(BaseSettings):
     # Google Calendar
     google_calendar_credentials: str = "credentials.json"
     google_calendar_token: str = "token.json"
+    google_calendar_ids: List[str] = ["primary"]  # Calendars read and merged by get_events
 
     # Microsoft Graph (Outlook)
     microsoft_client_id: Optional[str] = None
@@ -2,17 +2,31 @@
 
 import json
 from datetime import datetime
-from typing import List, Optional
-from sqlalchemy import create_engine, Column, String, Float, Boolean, DateTime, Text, Integer
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+from sqlalchemy import case, func, insert, or_, create_engine, Column, String, Float, Boolean, DateTime, Text, Integer, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 
 from config.settings import settings
-from models import Task, CalendarEvent, UserProfile
+from models import (
+    Task,
+    CalendarEvent,
+    UserProfile,
+    WorkingHoursPreference,
+    ProductivityPattern,
+    ScheduleAdherence
+)
 
 Base = declarative_base()
 
 
+class PlanningSnapshot(NamedTuple):
+    """Everything generate_plan reads from the database, loaded in one session."""
+    tasks: List[Task]
+    events: List[CalendarEvent]
+    profile: UserProfile
+
+
 class TaskDB(Base):
     """Database model for Task."""
     __tablename__ = "tasks"
@@ -38,6 +52,10 @@ class TaskDB(Base):
     tags = Column(Text)  # JSON array
     dependencies = Column(Text)  # JSON array
 
+    __table_args__ = (
+        Index("idx_tasks_status_deadline", "status", "deadline"),
+    )
+
 
 class CalendarEventDB(Base):
     """Database model for CalendarEvent."""
@@ -62,6 +80,10 @@ class CalendarEventDB(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        Index("idx_calendar_events_calendar_start", "calendar_id", "start_time"),
+    )
+
 
 class UserProfileDB(Base):
     """Database model for UserProfile."""
@@ -99,6 +121,25 @@ class PlanRefinementDB(Base):
     plan_date = Column(DateTime)  # When the plan was for
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("idx_plan_refinements_user_created", "user_id", "created_at"),
+    )
+
+
+class ChatMessageDB(Base):
+    """Database model for chat messages exchanged with the agent."""
+    __tablename__ = "chat_messages"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String, nullable=False)
+    role = Column(String, nullable=False)  # "user" or "assistant"
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_chat_messages_user_id", "user_id", "id"),
+    )
+
 
 class DatabaseManager:
     """Manages database operations."""
@@ -110,6 +151,11 @@ class DatabaseManager:
         self.SessionLocal = sessionmaker(bind=self.engine)
         Base.metadata.create_all(self.engine)
 
+        # create_all skips indexes on tables that already exist
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(self.engine, checkfirst=True)
+
     def get_session(self) -> Session:
         """Get a new database session."""
         return self.SessionLocal()
@@ -175,6 +221,52 @@ class DatabaseManager:
         finally:
             session.close()
 
+    def get_tasks(
+        self,
+        user_id: Optional[str] = None,
+        status: Optional[str] = None,
+        order_by: Optional[str] = "deadline"
+    ) -> List[Task]:
+        """
+        Retrieve tasks sorted in SQL.
+
+        Args:
+            user_id: Requesting user; tasks are not stored per user yet, so
+                this does not narrow the result
+            status: Only return tasks with this status
+            order_by: "priority" (most urgent first), "deadline" (soonest
+                first, undated last), "created" (newest first) or None
+
+        Returns:
+            List of Task objects
+        """
+        session = self.get_session()
+        try:
+            query = self._tasks_query(session, status, order_by)
+            return [self._task_from_db(t) for t in query.all()]
+        finally:
+            session.close()
+
+    def _tasks_query(self, session: Session, status: Optional[str], order_by: Optional[str]):
+        """Build the filtered and sorted task query used by get_tasks."""
+        query = session.query(TaskDB)
+        if status:
+            query = query.filter(TaskDB.status == status)
+
+        deadline_first = TaskDB.deadline.asc().nulls_last()
+        if order_by == "priority":
+            priority_rank = case(
+                {"urgent": 0, "high": 1, "medium": 2, "low": 3},
+                value=TaskDB.priority,
+                else_=4
+            )
+            query = query.order_by(priority_rank, deadline_first)
+        elif order_by == "deadline":
+            query = query.order_by(deadline_first)
+        elif order_by == "created":
+            query = query.order_by(TaskDB.created_at.desc())
+        return query
+
     def _task_from_db(self, task_db: TaskDB) -> Task:
         """Convert database model to Task."""
         return Task(
@@ -208,24 +300,7 @@ class DatabaseManager:
             if not event.id:
                 event.id = f"event_{datetime.utcnow().timestamp()}"
 
-            event_db = CalendarEventDB(
-                id=event.id,
-                calendar_id=event.calendar_id,
-                title=event.title,
-                description=event.description,
-                start_time=event.start_time,
-                end_time=event.end_time,
-                event_type=event.event_type.value if hasattr(event.event_type, 'value') else event.event_type,
-                location=event.location,
-                task_id=event.task_id,
-                is_all_day=event.is_all_day,
-                is_recurring=event.is_recurring,
-                organizer=event.organizer,
-                attendees=json.dumps(event.attendees),
-                source=event.source,
-                synced=event.synced,
-                last_synced=event.last_synced,
-            )
+            event_db = self._event_to_db(event)
 
             existing = session.query(CalendarEventDB).filter_by(id=event.id).first()
             if existing:
@@ -236,20 +311,132 @@ class DatabaseManager:
         finally:
             session.close()
 
+    def save_events(self, events: List[CalendarEvent]) -> List[CalendarEvent]:
+        """Save or update several calendar events in a single transaction."""
+        if not events:
+            return events
+
+        session = self.get_session()
+        try:
+            timestamp = datetime.utcnow().timestamp()
+            for idx, event in enumerate(events):
+                if not event.id:
+                    event.id = f"event_{timestamp}_{idx}"
+
+            ids = [event.id for event in events]
+            session.query(CalendarEventDB).filter(
+                CalendarEventDB.id.in_(ids)
+            ).delete(synchronize_session=False)
+            session.add_all([self._event_to_db(event) for event in events])
+            session.commit()
+            return events
+        finally:
+            session.close()
+
+    def delete_events(self, event_ids: List[str]) -> int:
+        """Delete calendar events by ID in a single statement."""
+        if not event_ids:
+            return 0
+
+        session = self.get_session()
+        try:
+            deleted = session.query(CalendarEventDB).filter(
+                CalendarEventDB.id.in_(event_ids)
+            ).delete(synchronize_session=False)
+            session.commit()
+            return deleted
+        finally:
+            session.close()
+
+    def delete_events_between(
+        self,
+        calendar_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        event_type: Optional[str] = None
+    ) -> int:
+        """Delete a calendar's events starting in [start_date, end_date) in one statement."""
+        session = self.get_session()
+        try:
+            query = session.query(CalendarEventDB).filter(
+                CalendarEventDB.calendar_id == calendar_id,
+                CalendarEventDB.start_time >= start_date,
+                CalendarEventDB.start_time < end_date,
+            )
+            if event_type:
+                query = query.filter(CalendarEventDB.event_type == event_type)
+            deleted = query.delete(synchronize_session=False)
+            session.commit()
+            return deleted
+        finally:
+            session.close()
+
+    def _event_to_db(self, event: CalendarEvent) -> CalendarEventDB:
+        """Convert CalendarEvent to database model."""
+        return CalendarEventDB(
+            id=event.id,
+            calendar_id=event.calendar_id,
+            title=event.title,
+            description=event.description,
+            start_time=event.start_time,
+            end_time=event.end_time,
+            event_type=event.event_type.value if hasattr(event.event_type, 'value') else event.event_type,
+            location=event.location,
+            task_id=event.task_id,
+            is_all_day=event.is_all_day,
+            is_recurring=event.is_recurring,
+            organizer=event.organizer,
+            attendees=json.dumps(event.attendees),
+            source=event.source,
+            synced=event.synced,
+            last_synced=event.last_synced,
+        )
+
     def get_events(self, start_date: datetime = None, end_date: datetime = None) -> List[CalendarEvent]:
         """Retrieve calendar events within a date range."""
         session = self.get_session()
         try:
-            query = session.query(CalendarEventDB)
-            if start_date:
-                query = query.filter(CalendarEventDB.end_time >= start_date)
-            if end_date:
-                query = query.filter(CalendarEventDB.start_time <= end_date)
-            events_db = query.all()
+            events_db = self._events_query(session, start_date, end_date).all()
             return [self._event_from_db(e) for e in events_db]
         finally:
             session.close()
 
+    def _events_query(self, session: Session, start_date: Optional[datetime], end_date: Optional[datetime]):
+        """Build the query for events overlapping a date range."""
+        query = session.query(CalendarEventDB)
+        if start_date:
+            query = query.filter(CalendarEventDB.end_time >= start_date)
+        if end_date:
+            query = query.filter(CalendarEventDB.start_time <= end_date)
+        return query
+
+    def iter_events_grouped_by_date(
+        self,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        batch_size: int = 100
+    ) -> Iterator[Tuple[str, datetime, datetime, str, bool]]:
+        """
+        Stream schedule summary rows in start time order.
+
+        Rows are fetched batch_size at a time, so only one batch is held in
+        memory while the caller consumes them.
+        """
+        session = self.get_session()
+        try:
+            # Same range filters as get_events, selecting only the summary columns
+            query = self._events_query(session, start_date, end_date).with_entities(
+                func.date(CalendarEventDB.start_time),
+                CalendarEventDB.start_time,
+                CalendarEventDB.end_time,
+                CalendarEventDB.title,
+                CalendarEventDB.is_all_day,
+            )
+            for row in query.order_by(CalendarEventDB.start_time).yield_per(batch_size):
+                yield tuple(row)
+        finally:
+            session.close()
+
     def _event_from_db(self, event_db: CalendarEventDB) -> CalendarEvent:
         """Convert database model to CalendarEvent."""
         return CalendarEvent(
@@ -318,10 +505,41 @@ class DatabaseManager:
         finally:
             session.close()
 
+    def get_planning_snapshot(
+        self,
+        user_id: str,
+        start_date: datetime = None,
+        end_date: datetime = None
+    ) -> PlanningSnapshot:
+        """
+        Load pending tasks, events in a date range and the user profile in one session.
+
+        Args:
+            user_id: Profile owner
+            start_date: Start of the event range
+            end_date: End of the event range
+
+        Returns:
+            PlanningSnapshot of (tasks, events, profile)
+        """
+        session = self.get_session()
+        try:
+            tasks_db = self._tasks_query(session, "pending", "deadline").all()
+            events_db = self._events_query(session, start_date, end_date).all()
+            profile_db = session.query(UserProfileDB).filter_by(user_id=user_id).first()
+
+            tasks = [self._task_from_db(t) for t in tasks_db]
+            events = [self._event_from_db(e) for e in events_db]
+            profile = self._profile_from_db(profile_db) if profile_db else None
+        finally:
+            session.close()
+
+        if profile is None:
+            profile = self.save_profile(UserProfile(user_id=user_id))
+        return PlanningSnapshot(tasks, events, profile)
+
     def _profile_from_db(self, profile_db: UserProfileDB) -> UserProfile:
         """Convert database model to UserProfile."""
-        from models.user_profile import WorkingHoursPreference, ProductivityPattern, ScheduleAdherence
-
         return UserProfile(
             user_id=profile_db.user_id,
             timezone=profile_db.timezone,
@@ -411,15 +629,27 @@ class DatabaseManager:
         finally:
             session.close()
 
-    def analyze_refinement_patterns(self, user_id: str) -> dict:
-        """Analyze common patterns in user's plan refinements."""
-        refinements = self.get_plan_refinements(user_id, limit=50)
+    def count_plan_refinements(self, user_id: str) -> int:
+        """Number of plan refinements saved for a user."""
+        session = self.get_session()
+        try:
+            return (
+                session.query(func.count())
+                .select_from(PlanRefinementDB)
+                .filter(PlanRefinementDB.user_id == user_id)
+                .scalar()
+            )
+        finally:
+            session.close()
 
-        if not refinements:
-            return {"total_refinements": 0, "patterns": []}
+    def analyze_refinement_patterns(self, user_id: str) -> dict:
+        """
+        Analyze common patterns in user's plan refinements.
 
-        # Categorize refinements
-        categories = {}
+        The latest 50 refinements are categorized and counted by one GROUP BY
+        query; uncategorized requests are matched against keywords in SQL, so
+        no rows or plan JSON are loaded into Python.
+        """
         common_keywords = {
             "timing": ["morning", "afternoon", "evening", "time", "earlier", "later"],
             "workload": ["too much", "too many", "reduce", "less", "more", "add"],
@@ -427,27 +657,141 @@ class DatabaseManager:
             "scheduling": ["move", "shift", "reschedule", "change"],
         }
 
-        for ref in refinements:
-            request_lower = ref["refinement_request"].lower()
+        session = self.get_session()
+        try:
+            latest = (
+                session.query(
+                    PlanRefinementDB.refinement_request,
+                    PlanRefinementDB.feedback_category,
+                    PlanRefinementDB.created_at,
+                )
+                .filter_by(user_id=user_id)
+                .order_by(PlanRefinementDB.created_at.desc())
+                .limit(50)
+                .subquery()
+            )
+
+            # Auto-categorize by the first matching keyword group if not already categorized
+            request_lower = func.lower(latest.c.refinement_request)
+            guessed = case(
+                *[
+                    (or_(*[func.instr(request_lower, keyword) > 0 for keyword in keywords]), category)
+                    for category, keywords in common_keywords.items()
+                ],
+                else_=None
+            )
+            category = case(
+                (func.coalesce(latest.c.feedback_category, "") == "", guessed),
+                else_=latest.c.feedback_category
+            )
+
+            # Most common first; ties go to the category seen most recently
+            counts = (
+                session.query(category, func.count())
+                .group_by(category)
+                .order_by(func.count().desc(), func.max(latest.c.created_at).desc())
+                .all()
+            )
+            total = sum(count for _, count in counts)
 
-            # Auto-categorize if not already categorized
-            if not ref.get("feedback_category"):
-                for category, keywords in common_keywords.items():
-                    if any(keyword in request_lower for keyword in keywords):
-                        categories[category] = categories.get(category, 0) + 1
-                        break
-            else:
-                cat = ref["feedback_category"]
-                categories[cat] = categories.get(cat, 0) + 1
+            if not total:
+                return {"total_refinements": 0, "patterns": []}
 
-        # Find most common patterns
-        sorted_patterns = sorted(categories.items(), key=lambda x: x[1], reverse=True)
+            recent = (
+                session.query(PlanRefinementDB.refinement_request)
+                .filter_by(user_id=user_id)
+                .order_by(PlanRefinementDB.created_at.desc())
+                .limit(5)
+                .all()
+            )
+        finally:
+            session.close()
 
         return {
-            "total_refinements": len(refinements),
+            "total_refinements": total,
             "patterns": [
-                {"category": cat, "count": count, "percentage": round(count / len(refinements) * 100, 1)}
-                for cat, count in sorted_patterns
+                {"category": cat, "count": count, "percentage": round(count / total * 100, 1)}
+                for cat, count in counts
+                if cat is not None
             ],
-            "recent_requests": [r["refinement_request"] for r in refinements[:5]]
+            "recent_requests": [request for (request,) in recent]
         }
+
+    # Chat history operations
+    def append_chat_messages(self, rows: List[Tuple[str, str, str, datetime]]) -> int:
+        """
+        Append several chat messages with one executemany INSERT.
+
+        Args:
+            rows: (user_id, role, content, created_at) tuples in send order
+
+        Returns:
+            Number of messages written
+        """
+        if not rows:
+            return 0
+
+        session = self.get_session()
+        try:
+            session.execute(
+                insert(ChatMessageDB),
+                [
+                    {"user_id": user_id, "role": role, "content": content, "created_at": ts}
+                    for user_id, role, content, ts in rows
+                ]
+            )
+            session.commit()
+            return len(rows)
+        finally:
+            session.close()
+
+    def get_recent_messages(
+        self,
+        user_id: str,
+        limit: int = 50,
+        before_id: int = None,
+        offset: int = 0
+    ) -> List[dict]:
+        """
+        Retrieve the most recent chat messages for a user, oldest first.
+
+        Args:
+            user_id: User whose messages to load
+            limit: Maximum number of messages
+            before_id: Only return messages older than this message ID
+            offset: Skip this many of the newest matching messages
+
+        Returns:
+            List of message dicts with id, role, content and created_at
+        """
+        session = self.get_session()
+        try:
+            query = session.query(ChatMessageDB).filter(ChatMessageDB.user_id == user_id)
+            if before_id is not None:
+                query = query.filter(ChatMessageDB.id < before_id)
+
+            messages_db = query.order_by(ChatMessageDB.id.desc()).offset(offset).limit(limit).all()
+
+            return [
+                {
+                    "id": m.id,
+                    "role": m.role,
+                    "content": m.content,
+                    "created_at": m.created_at
+                }
+                for m in reversed(messages_db)
+            ]
+        finally:
+            session.close()
+
+    def clear_chat_messages(self, user_id: str) -> int:
+        """Delete a user's chat history."""
+        session = self.get_session()
+        try:
+            deleted = session.query(ChatMessageDB).filter(
+                ChatMessageDB.user_id == user_id
+            ).delete(synchronize_session=False)
+            session.commit()
+            return deleted
+        finally:
+            session.close()
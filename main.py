@@ -239,6 +239,8 @@ def insights():
 [cyan]Schedule Adherence[/cyan]
 [yellow]Adherence Rate:[/yellow] {insights['schedule_adherence']['adherence_rate']:.1f}%
 [yellow]On-Time Completion:[/yellow] {insights['schedule_adherence']['on_time_completion_rate']:.1f}%
+[yellow]Average Overrun:[/yellow] {insights['completion_deviations']['average_duration_delta_hours']:+.1f} hours
+[yellow]Finished Late / Early:[/yellow] {insights['completion_deviations']['tasks_late']} / {insights['completion_deviations']['tasks_early']}
 
 [cyan]Learning Stats[/cyan]
 [yellow]Plans Generated:[/yellow] {insights['learning_stats']['total_plans_generated']}
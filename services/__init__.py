@@ -1,12 +1,26 @@
 """Services module."""
 
-from .calendar_service import CalendarService
-from .ai_planner import AIPlannerService, TaskPlan
-from .preference_learner import PreferenceLearner
-
-__all__ = [
-    "CalendarService",
-    "AIPlannerService",
-    "TaskPlan",
-    "PreferenceLearner",
-]
+from importlib import import_module
+
+# Exported name -> submodule defining it, imported on first access (PEP 562);
+# importing one service module no longer pulls in the Google/Microsoft calendar SDKs
+_EXPORTS = {
+    "CalendarService": ".calendar_service",
+    "AIPlannerService": ".ai_planner",
+    "TaskPlan": ".ai_planner",
+    "PreferenceLearner": ".preference_learner",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
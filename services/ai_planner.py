@@ -203,6 +203,9 @@ Please provide an updated plan that incorporates this feedback while maintaining
             }
         }
 
+        # Built outside the f-string: a backslash inside a replacement field needs Python 3.12+
+        context_section = f"# ADDITIONAL CONTEXT\n{context}\n" if context else ""
+
         prompt = f"""You are an expert AI task planning assistant. Your goal is to create an optimal, realistic schedule for the user's tasks based on their calendar, preferences, and learned working patterns.
 
 # TASKS TO SCHEDULE
@@ -214,7 +217,7 @@ Please provide an updated plan that incorporates this feedback while maintaining
 # USER PREFERENCES AND PATTERNS
 {json.dumps(preferences_info, indent=2)}
 
-{f"# ADDITIONAL CONTEXT\n{context}\n" if context else ""}
+{context_section}
 
 # YOUR TASK
 Create an optimal schedule that:
@@ -1,13 +1,40 @@
 """Multi-provider AI Planning Agent supporting Claude, OpenAI, and Google Gemini."""
 
+import hashlib
 import json
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional
 from enum import Enum
 
 from models import Task, CalendarEvent, UserProfile, TaskStatus
 
 
+# One keep-alive connection pool per SDK, shared by every planner in the process
+_http_clients: Dict[str, Any] = {}
+_http_clients_lock = threading.Lock()
+
+
+def _shared_http_client(provider: str):
+    """
+    Return the process-wide HTTP client for one SDK, creating it on first use.
+
+    Each SDK's own DefaultHttpxClient is used, so its timeouts, connection
+    limits and redirect handling stay as the SDK configures them; only the
+    connection pool is shared between planners.
+    """
+    with _http_clients_lock:
+        client = _http_clients.get(provider)
+        if client is None:
+            if provider == "anthropic":
+                from anthropic import DefaultHttpxClient
+            else:
+                from openai import DefaultHttpxClient
+            client = _http_clients[provider] = DefaultHttpxClient()
+        return client
+
+
 class AIProvider(str, Enum):
     """Supported AI providers."""
     ANTHROPIC = "anthropic"
@@ -29,6 +56,9 @@ class TaskPlan(dict):
 class AIPlannerService:
     """AI-powered planning service supporting multiple providers."""
 
+    # Refined plans remembered per (feedback, previous plan), least recently used dropped first
+    REFINE_CACHE_SIZE = 128
+
     def __init__(self, provider: str = "anthropic", api_key: str = None, model_name: str = None):
         """
         Initialize AI planner with specified provider.
@@ -42,15 +72,20 @@ class AIPlannerService:
         self.api_key = api_key
         self.conversation_history = []
 
+        # Plan JSON per (normalized feedback, previous plan digest)
+        self._refine_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        # Guards the history and the refine cache; plans are refined on background threads
+        self._lock = threading.Lock()
+
         # Initialize the appropriate client
         if self.provider == AIProvider.ANTHROPIC:
             from anthropic import Anthropic
-            self.client = Anthropic(api_key=api_key)
+            self.client = Anthropic(api_key=api_key, http_client=_shared_http_client("anthropic"))
             self.model = model_name or "claude-sonnet-4-5-20250929"
 
         elif self.provider == AIProvider.OPENAI:
             from openai import OpenAI
-            self.client = OpenAI(api_key=api_key)
+            self.client = OpenAI(api_key=api_key, http_client=_shared_http_client("openai"))
             self.model = model_name or "gpt-4o"
 
         elif self.provider == AIProvider.GOOGLE:
@@ -94,14 +129,7 @@ class AIPlannerService:
             plan = self._parse_plan_response(plan_text)
 
             # Store conversation for iterative refinement
-            self.conversation_history.append({
-                "role": "user",
-                "content": prompt
-            })
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": plan_text
-            })
+            self._remember(prompt, plan_text)
 
             return plan
 
@@ -124,6 +152,15 @@ class AIPlannerService:
         Returns:
             Refined TaskPlan
         """
+        # The same feedback on the same plan reuses the earlier answer instead of calling the AI again
+        cache_key = self._refine_key(feedback, previous_plan)
+        with self._lock:
+            cached = self._refine_cache.get(cache_key)
+            if cached is not None:
+                self._refine_cache.move_to_end(cache_key)
+        if cached is not None:
+            return TaskPlan(json.loads(cached))
+
         refinement_prompt = f"""
 Based on my previous plan, please refine it with the following feedback:
 
@@ -144,14 +181,14 @@ Please provide an updated plan that incorporates this feedback while maintaining
             refined_plan = self._parse_plan_response(plan_text)
 
             # Update conversation history
-            self.conversation_history.append({
-                "role": "user",
-                "content": refinement_prompt
-            })
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": plan_text
-            })
+            self._remember(refinement_prompt, plan_text)
+
+            # Only remember plans that parsed into scheduled tasks
+            if refined_plan.get('scheduled_tasks'):
+                with self._lock:
+                    self._refine_cache[cache_key] = json.dumps(refined_plan)
+                    if len(self._refine_cache) > self.REFINE_CACHE_SIZE:
+                        self._refine_cache.popitem(last=False)
 
             return refined_plan
 
@@ -159,79 +196,177 @@ Please provide an updated plan that incorporates this feedback while maintaining
             print(f"Error refining plan: {e}")
             raise
 
-    def chat(self, message: str) -> str:
+    @staticmethod
+    def _refine_key(feedback: str, previous_plan: Dict[str, Any]) -> tuple:
+        """Cache key for a refinement: feedback with case and whitespace folded, plus a digest of the plan."""
+        normalized = " ".join(feedback.lower().split())
+        plan_json = json.dumps(previous_plan, sort_keys=True, default=str)
+        return normalized, hashlib.blake2b(plan_json.encode(), digest_size=16).hexdigest()
+
+    def _remember(self, prompt: str, response: str):
+        """Append one prompt/response exchange to the conversation history."""
+        # A new list rather than append(), so a request building from the old one sees a consistent snapshot
+        with self._lock:
+            self.conversation_history = self.conversation_history + [
+                {"role": "user", "content": prompt},
+                {"role": "assistant", "content": response},
+            ]
+
+    def chat(self, message: str, context: Optional[List[Dict[str, str]]] = None) -> str:
         """
         Simple chat interface with the AI.
 
         Args:
             message: User message
+            context: Recent chat messages sent after the planner's own
+                conversation history (e.g. a windowed chat transcript)
 
         Returns:
             AI response
         """
         try:
             if self.provider == AIProvider.ANTHROPIC:
-                return self._call_anthropic(message, use_history=True)
+                return self._call_anthropic(message, use_history=True, history=context)
             elif self.provider == AIProvider.OPENAI:
-                return self._call_openai(message, use_history=True)
+                return self._call_openai(message, use_history=True, history=context)
             elif self.provider == AIProvider.GOOGLE:
-                return self._call_google(message, use_history=True)
+                return self._call_google(message, use_history=True, history=context)
         except Exception as e:
             return f"Error: {str(e)}"
 
-    def _call_anthropic(self, prompt: str, use_history: bool = False) -> str:
-        """Call Anthropic Claude API."""
+    def chat_stream(self, message: str, context: Optional[List[Dict[str, str]]] = None) -> Iterator[str]:
+        """
+        Streaming variant of chat() that yields the response as it is generated.
+
+        Args:
+            message: User message
+            context: Recent chat messages sent after the planner's own
+                conversation history
+
+        Yields:
+            Chunks of the AI response text
+        """
+        try:
+            if self.provider == AIProvider.ANTHROPIC:
+                request = self._anthropic_request(message, True, context)
+                with self.client.messages.stream(**request) as stream:
+                    yield from stream.text_stream
+
+            elif self.provider == AIProvider.OPENAI:
+                stream = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._openai_messages(message, True, context),
+                    temperature=0.7,
+                    max_tokens=4096,
+                    stream=True
+                )
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+
+            elif self.provider == AIProvider.GOOGLE:
+                conversation, prompt = self._google_request(message, True, context)
+                if conversation is not None:
+                    response = self.client.start_chat(history=conversation).send_message(prompt, stream=True)
+                else:
+                    response = self.client.generate_content(prompt, stream=True)
+                for chunk in response:
+                    if chunk.text:
+                        yield chunk.text
+        except Exception as e:
+            yield f"Error: {str(e)}"
+
+    def _with_context(self, context: Optional[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        """The planner's conversation history (plans and refinements) followed by any chat context."""
+        return self.conversation_history + list(context or [])
+
+    def _history(self, history: Optional[List[Dict[str, str]]]) -> tuple:
+        """Split the planner's history plus the given chat context into a system preamble and chat turns."""
+        history = self._with_context(history)
+
+        system = "\n\n".join(m["content"] for m in history if m["role"] == "system")
+        turns = [m for m in history if m["role"] != "system"]
+        return system, turns
+
+    def _anthropic_request(self, prompt: str, use_history: bool,
+                           history: Optional[List[Dict[str, str]]]) -> Dict[str, Any]:
+        """Keyword arguments for an Anthropic messages call."""
+        system = ""
         messages = []
         if use_history:
-            messages = self.conversation_history.copy()
+            system, turns = self._history(history)
+            messages = list(turns)
         messages.append({"role": "user", "content": prompt})
 
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=4096,
-            temperature=0.7,
-            messages=messages
-        )
-        return response.content[0].text
+        request = {
+            "model": self.model,
+            "max_tokens": 4096,
+            "temperature": 0.7,
+            "messages": messages,
+        }
+        if system:
+            request["system"] = system
+        return request
 
-    def _call_openai(self, prompt: str, use_history: bool = False) -> str:
-        """Call OpenAI API."""
+    def _openai_messages(self, prompt: str, use_history: bool,
+                         history: Optional[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        """Message list for an OpenAI chat completion."""
         messages = []
         if use_history:
             # Convert history to OpenAI format
-            for msg in self.conversation_history:
+            for msg in self._with_context(history):
                 messages.append({
                     "role": msg["role"],
                     "content": msg["content"]
                 })
         messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def _google_request(self, prompt: str, use_history: bool,
+                        history: Optional[List[Dict[str, str]]]) -> tuple:
+        """Gemini chat history (or None for a single-shot call) and the final prompt."""
+        system, turns = self._history(history) if use_history else ("", [])
+        if system:
+            prompt = f"{system}\n\n{prompt}"
+
+        if not turns:
+            return None, prompt
+
+        # Build conversation context
+        conversation = []
+        for msg in turns:
+            role = "user" if msg["role"] == "user" else "model"
+            conversation.append({
+                "role": role,
+                "parts": [msg["content"]]
+            })
+        return conversation, prompt
+
+    def _call_anthropic(self, prompt: str, use_history: bool = False,
+                        history: Optional[List[Dict[str, str]]] = None) -> str:
+        """Call Anthropic Claude API."""
+        response = self.client.messages.create(**self._anthropic_request(prompt, use_history, history))
+        return response.content[0].text
 
+    def _call_openai(self, prompt: str, use_history: bool = False,
+                     history: Optional[List[Dict[str, str]]] = None) -> str:
+        """Call OpenAI API."""
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=messages,
+            messages=self._openai_messages(prompt, use_history, history),
             temperature=0.7,
             max_tokens=4096
         )
         return response.choices[0].message.content
 
-    def _call_google(self, prompt: str, use_history: bool = False) -> str:
+    def _call_google(self, prompt: str, use_history: bool = False,
+                     history: Optional[List[Dict[str, str]]] = None) -> str:
         """Call Google Gemini API."""
-        if use_history and self.conversation_history:
-            # Build conversation context
-            conversation = []
-            for msg in self.conversation_history:
-                role = "user" if msg["role"] == "user" else "model"
-                conversation.append({
-                    "role": role,
-                    "parts": [msg["content"]]
-                })
-            conversation.append({
-                "role": "user",
-                "parts": [prompt]
-            })
+        conversation, prompt = self._google_request(prompt, use_history, history)
 
+        if conversation is not None:
             # Create chat session
-            chat = self.client.start_chat(history=conversation[:-1])
+            chat = self.client.start_chat(history=conversation)
             response = chat.send_message(prompt)
         else:
             response = self.client.generate_content(prompt)
@@ -303,6 +438,9 @@ Please provide an updated plan that incorporates this feedback while maintaining
             }
         }
 
+        # Built outside the f-string: a backslash inside a replacement field needs Python 3.12+
+        context_section = f"# ADDITIONAL CONTEXT\n{context}\n" if context else ""
+
         prompt = f"""You are an expert AI task planning assistant. Your goal is to create an optimal, realistic schedule for the user's tasks based on their calendar, preferences, and learned working patterns.
 
 # TASKS TO SCHEDULE
@@ -314,7 +452,7 @@ Please provide an updated plan that incorporates this feedback while maintaining
 # USER PREFERENCES AND PATTERNS
 {json.dumps(preferences_info, indent=2)}
 
-{f"# ADDITIONAL CONTEXT\n{context}\n" if context else ""}
+{context_section}
 
 # YOUR TASK
 Create an optimal schedule that:
@@ -482,4 +620,5 @@ Provide insights in JSON format:
 
     def reset_conversation(self):
         """Reset conversation history for a new planning session."""
-        self.conversation_history = []
+        with self._lock:
+            self.conversation_history = []
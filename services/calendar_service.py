@@ -1,8 +1,10 @@
 """Calendar integration service for Google Calendar and Outlook."""
 
+import logging
 import os
 import pickle
 from datetime import datetime, timedelta
+from operator import attrgetter
 from typing import List, Optional
 from abc import ABC, abstractmethod
 
@@ -16,6 +18,14 @@ from msal import ConfidentialClientApplication
 from models import CalendarEvent, EventType
 from config.settings import settings
 
+logger = logging.getLogger(__name__)
+
+
+def _occurrence_start(google_event: dict) -> Optional[str]:
+    """Original start of a recurring instance, else the event's own start, as Google sent it."""
+    start = google_event.get('originalStartTime') or google_event.get('start') or {}
+    return start.get('dateTime') or start.get('date')
+
 
 class CalendarServiceBase(ABC):
     """Base class for calendar services."""
@@ -30,6 +40,22 @@ class CalendarServiceBase(ABC):
         """Create an event on the calendar."""
         pass
 
+    def create_events_bulk(self, events: List[CalendarEvent]) -> List[CalendarEvent]:
+        """
+        Create several events; providers with a batch endpoint override this.
+
+        An event that fails is logged and returned unsynced, so one failure
+        does not stop the rest.
+        """
+        created = []
+        for event in events:
+            try:
+                created.append(self.create_event(event))
+            except Exception as e:
+                logger.warning("Error creating calendar event %r: %s", event.title, e)
+                created.append(event)
+        return created
+
     @abstractmethod
     def update_event(self, event: CalendarEvent) -> CalendarEvent:
         """Update an existing event."""
@@ -45,6 +71,8 @@ class GoogleCalendarService(CalendarServiceBase):
     """Google Calendar integration service."""
 
     SCOPES = ['https://www.googleapis.com/auth/calendar']
+    # Requests sent per batch HTTP call
+    BATCH_SIZE = 50
 
     def __init__(self):
         """Initialize Google Calendar service."""
@@ -82,32 +110,55 @@ class GoogleCalendarService(CalendarServiceBase):
         self.service = build('calendar', 'v3', credentials=creds)
 
     def get_events(self, start_date: datetime, end_date: datetime) -> List[CalendarEvent]:
-        """Retrieve events from Google Calendar."""
+        """Retrieve events from the configured Google calendars."""
+        return self.get_events_multi(start_date, end_date, settings.google_calendar_ids)
+
+    def get_events_multi(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        calendar_ids: List[str]
+    ) -> List[CalendarEvent]:
+        """
+        Retrieve events from several Google calendars.
+
+        Events shared between calendars are returned once. They are keyed on
+        their iCalUID (falling back to the event id) together with the start
+        of the occurrence, because every instance of a recurring event shares
+        one iCalUID.
+        """
         if not self.service:
             return []
 
-        try:
-            events_result = self.service.events().list(
-                calendarId='primary',
-                timeMin=start_date.isoformat() + 'Z',
-                timeMax=end_date.isoformat() + 'Z',
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-
-            events = events_result.get('items', [])
-            calendar_events = []
-
-            for event in events:
-                calendar_event = self._convert_from_google(event)
+        seen: set = set()
+        calendar_events = []
+
+        for calendar_id in calendar_ids:
+            try:
+                events_result = self.service.events().list(
+                    calendarId=calendar_id,
+                    timeMin=start_date.isoformat() + 'Z',
+                    timeMax=end_date.isoformat() + 'Z',
+                    singleEvents=True,
+                    orderBy='startTime'
+                ).execute()
+            except Exception as e:
+                logger.warning("Error fetching Google Calendar events from %s: %s", calendar_id, e)
+                continue
+
+            for google_event in events_result.get('items', []):
+                # Skip duplicates before paying for the conversion
+                event_key = (google_event.get('iCalUID') or google_event.get('id'), _occurrence_start(google_event))
+                if event_key in seen:
+                    continue
+                seen.add(event_key)
+
+                calendar_event = self._convert_from_google(google_event)
                 if calendar_event:
                     calendar_events.append(calendar_event)
 
-            return calendar_events
-
-        except Exception as e:
-            print(f"Error fetching Google Calendar events: {e}")
-            return []
+        calendar_events.sort(key=attrgetter('start_time'))
+        return calendar_events
 
     def create_event(self, event: CalendarEvent) -> CalendarEvent:
         """Create an event on Google Calendar."""
@@ -130,9 +181,47 @@ class GoogleCalendarService(CalendarServiceBase):
             return event
 
         except Exception as e:
-            print(f"Error creating Google Calendar event: {e}")
+            logger.warning("Error creating Google Calendar event: %s", e)
             raise
 
+    def create_events_bulk(self, events: List[CalendarEvent]) -> List[CalendarEvent]:
+        """
+        Create several events on Google Calendar with batched HTTP requests.
+
+        Events that fail to insert, or whose batch fails as a whole, are
+        logged and returned unsynced.
+        """
+        if not self.service:
+            raise RuntimeError("Google Calendar service not initialized")
+
+        def on_created(request_id, response, exception):
+            event = events[int(request_id)]
+            if exception is not None:
+                logger.warning("Error creating Google Calendar event: %s", exception)
+                return
+
+            event.calendar_id = response['id']
+            event.synced = True
+            event.last_synced = datetime.utcnow()
+            event.source = 'google'
+
+        for offset in range(0, len(events), self.BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=on_created)
+            for idx in range(offset, min(offset + self.BATCH_SIZE, len(events))):
+                batch.add(
+                    self.service.events().insert(
+                        calendarId='primary',
+                        body=self._convert_to_google(events[idx])
+                    ),
+                    request_id=str(idx)
+                )
+            try:
+                batch.execute()
+            except Exception as e:
+                logger.warning("Error sending Google Calendar batch: %s", e)
+
+        return events
+
     def update_event(self, event: CalendarEvent) -> CalendarEvent:
         """Update an existing event on Google Calendar."""
         if not self.service or not event.calendar_id:
@@ -153,7 +242,7 @@ class GoogleCalendarService(CalendarServiceBase):
             return event
 
         except Exception as e:
-            print(f"Error updating Google Calendar event: {e}")
+            logger.warning("Error updating Google Calendar event: %s", e)
             raise
 
     def delete_event(self, event_id: str) -> bool:
@@ -169,7 +258,7 @@ class GoogleCalendarService(CalendarServiceBase):
             return True
 
         except Exception as e:
-            print(f"Error deleting Google Calendar event: {e}")
+            logger.warning("Error deleting Google Calendar event: %s", e)
             return False
 
     def _convert_from_google(self, google_event: dict) -> Optional[CalendarEvent]:
@@ -206,7 +295,7 @@ class GoogleCalendarService(CalendarServiceBase):
             )
 
         except Exception as e:
-            print(f"Error converting Google event: {e}")
+            logger.debug("Error converting Google event %s: %s", google_event.get('id'), e)
             return None
 
     def _convert_to_google(self, event: CalendarEvent) -> dict:
@@ -267,6 +356,10 @@ class OutlookCalendarService(CalendarServiceBase):
         print("Outlook Calendar integration not yet fully implemented")
         return event
 
+    def create_events_bulk(self, events: List[CalendarEvent]) -> List[CalendarEvent]:
+        """Outlook sync is not implemented, so the whole batch is reported as unsupported."""
+        raise NotImplementedError("Outlook Calendar integration not yet fully implemented")
+
     def update_event(self, event: CalendarEvent) -> CalendarEvent:
         """Update an existing event on Outlook Calendar."""
         print("Outlook Calendar integration not yet fully implemented")
@@ -305,6 +398,10 @@ class CalendarService:
         """Create an event on the calendar."""
         return self.service.create_event(event)
 
+    def create_events_bulk(self, events: List[CalendarEvent]) -> List[CalendarEvent]:
+        """Create several events on the calendar in as few requests as the provider allows."""
+        return self.service.create_events_bulk(events)
+
     def update_event(self, event: CalendarEvent) -> CalendarEvent:
         """Update an existing event."""
         return self.service.update_event(event)
@@ -319,7 +416,7 @@ class CalendarService:
         events = self.get_events(start_date, end_date)
 
         # Sort events by start time
-        events.sort(key=lambda e: e.start_time)
+        events.sort(key=attrgetter('start_time'))
 
         free_slots = []
         current_time = start_date
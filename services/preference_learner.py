@@ -4,9 +4,33 @@ from datetime import datetime, time
 from typing import Dict, Any, List
 from collections import defaultdict
 
+import numpy as np
+
 from models import Task, UserProfile, TaskStatus
 
 
+def _summarize_deviations(planned_starts, planned_ends, actual_starts, actual_ends):
+    """
+    Aggregate planned vs actual timings given as int64 epoch seconds.
+
+    Returns (mean duration delta hours, mean end delay hours,
+    late count, early count), where positive values mean "took longer"
+    or "finished later" than planned.
+    """
+    if planned_starts.shape[0] == 0:
+        return 0.0, 0.0, 0, 0
+
+    duration_delta = ((actual_ends - actual_starts) - (planned_ends - planned_starts)) / 3600.0
+    end_delay = (actual_ends - planned_ends) / 3600.0
+
+    return (
+        duration_delta.mean(),
+        end_delay.mean(),
+        np.count_nonzero(end_delay > 0.25),
+        np.count_nonzero(end_delay < -0.25),
+    )
+
+
 class PreferenceLearner:
     """Learns and adapts user preferences based on behavior."""
 
@@ -244,6 +268,42 @@ class PreferenceLearner:
         else:
             return 'afternoon'
 
+    def summarize_completions(self, tasks: List[Task]) -> Dict[str, Any]:
+        """
+        Summarize how completed tasks deviated from their schedule.
+
+        Timestamps are converted to columnar int64 arrays once and
+        aggregated with whole-array NumPy operations.
+
+        Args:
+            tasks: Tasks with scheduled and actual start/end times
+
+        Returns:
+            Dictionary with aggregate deviation statistics
+        """
+        tracked = [
+            t for t in tasks
+            if t.scheduled_start and t.scheduled_end and t.actual_start and t.actual_end
+        ]
+
+        def column(attr: str) -> np.ndarray:
+            return np.array([int(getattr(t, attr).timestamp()) for t in tracked], dtype=np.int64)
+
+        duration_delta, end_delay, late, early = _summarize_deviations(
+            column('scheduled_start'),
+            column('scheduled_end'),
+            column('actual_start'),
+            column('actual_end'),
+        )
+
+        return {
+            'tasks_analyzed': len(tracked),
+            'average_duration_delta_hours': float(duration_delta),
+            'average_end_delay_hours': float(end_delay),
+            'tasks_late': int(late),
+            'tasks_early': int(early),
+        }
+
     def generate_insights_report(self, user_profile: UserProfile) -> Dict[str, Any]:
         """
         Generate insights report about learned preferences and patterns.
@@ -1,9 +1,132 @@
 """Text-based calendar service without external API integration."""
 
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from itertools import chain, groupby
+from operator import itemgetter
+from time import time as _epoch_seconds
+from typing import Iterator, List, Dict, Any, Optional, Protocol, Tuple
+
+import numpy as np
+
 from models import CalendarEvent, EventType
 
+try:
+    from ciso8601 import parse_datetime as _parse_dt
+except ImportError:
+    _parse_dt = datetime.fromisoformat
+
+# A UTC designator or numeric offset after the time part of an ISO timestamp
+_TZ_SUFFIX_RE = re.compile(r"[T ][^Zz+-]*[Zz+-]")
+
+# Constants reused for every event built from a plan
+_TASK_ID_PREFIX = "Task ID: "
+_SCHEDULED_TASK = EventType.SCHEDULED_TASK
+
+
+def _ymd(dt: datetime) -> str:
+    """Format a datetime as YYYY-MM-DD without going through strftime."""
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}"
+
+
+def _hm(dt: datetime) -> str:
+    """Format a datetime as HH:MM without going through strftime."""
+    return f"{dt.hour:02d}:{dt.minute:02d}"
+
+
+def _overlap_matrix(a: List[CalendarEvent], b: List[CalendarEvent]):
+    """
+    Boolean matrix where [i, j] is True if a[i] and b[j] overlap in time.
+
+    Start/end times are converted to integer timestamps once and compared
+    by broadcasting instead of a nested Python loop.
+    """
+    a_starts = np.array([int(e.start_time.timestamp()) for e in a], dtype=np.int64)
+    a_ends = np.array([int(e.end_time.timestamp()) for e in a], dtype=np.int64)
+    b_starts = np.array([int(e.start_time.timestamp()) for e in b], dtype=np.int64)
+    b_ends = np.array([int(e.end_time.timestamp()) for e in b], dtype=np.int64)
+
+    return (a_starts[:, None] < b_ends[None, :]) & (a_ends[:, None] > b_starts[None, :])
+
+
+@lru_cache(maxsize=1)
+def _midnight_for_second(second: int) -> datetime:
+    """Local midnight of the day containing the given epoch second."""
+    return datetime.combine(date.fromtimestamp(second), time.min)
+
+
+def _today_midnight() -> datetime:
+    """Today's local midnight, computed at most once per wall-clock second."""
+    return _midnight_for_second(int(_epoch_seconds()))
+
+
+class DBAdapter(Protocol):
+    """Storage interface TextCalendarService needs from a database manager."""
+
+    def save_event(self, event: CalendarEvent) -> CalendarEvent:
+        ...
+
+    def save_events(self, events: List[CalendarEvent]) -> List[CalendarEvent]:
+        ...
+
+    def get_events(self, start_date: datetime = None, end_date: datetime = None) -> List[CalendarEvent]:
+        ...
+
+    def delete_events(self, event_ids: List[str]) -> int:
+        ...
+
+    def delete_events_between(
+        self,
+        calendar_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        event_type: Optional[str] = None
+    ) -> int:
+        ...
+
+    def iter_events_grouped_by_date(
+        self,
+        start_date: datetime = None,
+        end_date: datetime = None
+    ) -> Iterator[Tuple[str, datetime, datetime, str, bool]]:
+        ...
+
+
+class _NullDB:
+    """Stand-in storage when no database is configured: writes are dropped and reads are empty."""
+
+    def save_event(self, event: CalendarEvent) -> CalendarEvent:
+        return event
+
+    def save_events(self, events: List[CalendarEvent]) -> List[CalendarEvent]:
+        return events
+
+    def get_events(self, start_date: datetime = None, end_date: datetime = None) -> List[CalendarEvent]:
+        return []
+
+    def delete_events(self, event_ids: List[str]) -> int:
+        return 0
+
+    def delete_events_between(
+        self,
+        calendar_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        event_type: Optional[str] = None
+    ) -> int:
+        return 0
+
+    def iter_events_grouped_by_date(
+        self,
+        start_date: datetime = None,
+        end_date: datetime = None
+    ) -> Iterator[Tuple[str, datetime, datetime, str, bool]]:
+        return iter(())
+
 
 class TextCalendarService:
     """
@@ -11,10 +134,27 @@ class TextCalendarService:
     No external API integration - all schedules are managed through conversation.
     """
 
-    def __init__(self, user_id: str, db_manager=None):
+    # Plans with at least this many tasks build their events on a thread pool
+    PARALLEL_BUILD_THRESHOLD = 256
+    # Plans with at least this many tasks parse timestamps with NumPy
+    BULK_PARSE_THRESHOLD = 1000
+    # Date ranges whose events are kept in memory, least recently used dropped first
+    EVENTS_CACHE_SIZE = 32
+
+    def __init__(self, user_id: str, db_manager: Optional[DBAdapter] = None):
         """Initialize text-based calendar service."""
         self.user_id = user_id
-        self.db = db_manager
+        # A null adapter stands in for a missing database, so no call site checks for one
+        self.db: DBAdapter = db_manager if db_manager is not None else _NullDB()
+        self._save_event = self.db.save_event
+        self._load_events = self.db.get_events
+
+        # Events per (start_date, end_date) range, cleared on every write. The service is
+        # shared across sessions and plans are executed on worker threads, hence the lock;
+        # the generation keeps a read that overlapped a write from caching stale events.
+        self._events_cache: "OrderedDict[tuple, List[CalendarEvent]]" = OrderedDict()
+        self._events_lock = threading.Lock()
+        self._events_generation = 0
 
     def parse_schedule_from_text(self, schedule_text: str, week_start: datetime = None) -> List[CalendarEvent]:
         """
@@ -29,11 +169,11 @@ class TextCalendarService:
         """
         # This will be enhanced by AI to parse natural language schedules
         # For now, store as a single event
-        if week_start is None:
-            week_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return [self._build_schedule_event(schedule_text, week_start or self._default_week_start())]
 
-        # Store the raw schedule text as a special event
-        schedule_event = CalendarEvent(
+    def _build_schedule_event(self, schedule_text: str, week_start: datetime) -> CalendarEvent:
+        """Store the raw schedule text as a special all-day event for the week."""
+        return CalendarEvent(
             calendar_id=self.user_id,
             title="Weekly Schedule",
             description=schedule_text,
@@ -43,7 +183,11 @@ class TextCalendarService:
             is_all_day=True
         )
 
-        return [schedule_event]
+    @staticmethod
+    def _default_week_start() -> datetime:
+        """Midnight of this week's Monday."""
+        today = _today_midnight()
+        return today - timedelta(days=today.weekday())
 
     def get_events(self, start_date: datetime, end_date: datetime) -> List[CalendarEvent]:
         """
@@ -56,11 +200,29 @@ class TextCalendarService:
         Returns:
             List of CalendarEvent objects from database
         """
-        if self.db is None:
-            return []
-
-        # Get events from database using the correct method name
-        return self.db.get_events(start_date, end_date)
+        key = (start_date, end_date)
+        with self._events_lock:
+            events = self._events_cache.get(key)
+            if events is not None:
+                self._events_cache.move_to_end(key)
+                return list(events)
+            generation = self._events_generation
+
+        events = self._load_events(start_date, end_date)
+
+        with self._events_lock:
+            if generation == self._events_generation:
+                self._events_cache[key] = events
+                if len(self._events_cache) > self.EVENTS_CACHE_SIZE:
+                    self._events_cache.popitem(last=False)
+
+        return list(events)
+
+    def _invalidate_events(self) -> None:
+        """Forget all cached event ranges after a write."""
+        with self._events_lock:
+            self._events_cache.clear()
+            self._events_generation += 1
 
     def create_event(self, event: CalendarEvent) -> CalendarEvent:
         """
@@ -72,8 +234,8 @@ class TextCalendarService:
         Returns:
             Created CalendarEvent
         """
-        if self.db is not None:
-            self.db.save_event(event)
+        self._save_event(event)
+        self._invalidate_events()
         return event
 
     def create_events_from_plan(self, planned_tasks: List[Dict[str, Any]]) -> List[CalendarEvent]:
@@ -86,19 +248,96 @@ class TextCalendarService:
         Returns:
             List of created CalendarEvent objects
         """
-        events = []
-        for task in planned_tasks:
-            event = CalendarEvent(
-                calendar_id=self.user_id,
-                title=task.get('title', 'Scheduled Task'),
-                description=f"Task ID: {task.get('task_id')}\n{task.get('rationale', '')}",
-                start_time=datetime.fromisoformat(task['scheduled_start']),
-                end_time=datetime.fromisoformat(task['scheduled_end']),
-                event_type=EventType.SCHEDULED_TASK
-            )
-            created_event = self.create_event(event)
-            events.append(created_event)
+        starts, ends = self._parse_plan_times(planned_tasks)
+
+        if len(planned_tasks) >= self.PARALLEL_BUILD_THRESHOLD:
+            with ThreadPoolExecutor() as executor:
+                events = list(executor.map(self._build_event, planned_tasks, starts, ends))
+        else:
+            events = [self._build_event(*args) for args in zip(planned_tasks, starts, ends)]
+
+        if events:
+            self._clear_conflicts(events, min(starts), max(ends))
+
+        return self._save_events(events)
+
+    def _clear_conflicts(self, events: List[CalendarEvent], window_start: datetime, window_end: datetime) -> int:
+        """
+        Delete previously scheduled slots of the same tasks that overlap the given events.
+
+        Re-executing a plan replaces the old slots of each task it collides
+        with instead of stacking duplicates on top of them. Events of other
+        tasks, and events with no task ID, are never deleted.
 
+        Returns:
+            Number of events deleted
+        """
+        planned_ids = {e.task_id for e in events if e.task_id}
+        # Read straight from the database: deletions must not act on a cached view
+        existing = [
+            e for e in self._load_events(window_start, window_end)
+            if e.event_type == _SCHEDULED_TASK and e.id and e.task_id in planned_ids
+        ]
+        if not existing:
+            return 0
+
+        # Task IDs as integer codes, compared by broadcasting; -1 never matches an existing event
+        codes = {task_id: i for i, task_id in enumerate(planned_ids)}
+        old_codes = np.array([codes[e.task_id] for e in existing], dtype=np.int64)
+        new_codes = np.array([codes.get(e.task_id, -1) for e in events], dtype=np.int64)
+        same_task = old_codes[:, None] == new_codes[None, :]
+        conflicts = (_overlap_matrix(existing, events) & same_task).any(axis=1)
+        conflict_ids = [e.id for e, hit in zip(existing, conflicts) if hit]
+        if conflict_ids:
+            self.db.delete_events(conflict_ids)
+            self._invalidate_events()
+        return len(conflict_ids)
+
+    def _parse_plan_times(self, planned_tasks: List[Dict[str, Any]]) -> Tuple[List[datetime], List[datetime]]:
+        """
+        Parse the scheduled start/end timestamps of every planned task.
+
+        Large plans are parsed column-wise by NumPy. Timezone-aware or
+        malformed timestamps fall back to the per-item parser. Tasks that
+        already carry parsed ``_start_dt``/``_end_dt`` datetimes are used as-is.
+        """
+        if all('_start_dt' in task and '_end_dt' in task for task in planned_tasks):
+            return [task['_start_dt'] for task in planned_tasks], [task['_end_dt'] for task in planned_tasks]
+
+        starts = [task['scheduled_start'] for task in planned_tasks]
+        ends = [task['scheduled_end'] for task in planned_tasks]
+
+        # NumPy only warns on timezone-aware input and converts it to naive UTC,
+        # so those plans are left to the per-item parser
+        if (len(planned_tasks) >= self.BULK_PARSE_THRESHOLD
+                and not any(_TZ_SUFFIX_RE.search(s) for s in chain(starts, ends))):
+            try:
+                return (
+                    np.array(starts, dtype='datetime64[us]').astype(object).tolist(),
+                    np.array(ends, dtype='datetime64[us]').astype(object).tolist(),
+                )
+            except ValueError:
+                pass
+
+        return [_parse_dt(s) for s in starts], [_parse_dt(e) for e in ends]
+
+    def _build_event(self, task: Dict[str, Any], start_time: datetime, end_time: datetime) -> CalendarEvent:
+        """Build the CalendarEvent for one scheduled task from a plan."""
+        task_id = task.get('task_id')
+        return CalendarEvent(
+            calendar_id=self.user_id,
+            title=task.get('title', 'Scheduled Task'),
+            description=_TASK_ID_PREFIX + str(task_id) + "\n" + task.get('rationale', ''),
+            start_time=start_time,
+            end_time=end_time,
+            event_type=_SCHEDULED_TASK,
+            task_id=str(task_id) if task_id is not None else None
+        )
+
+    def _save_events(self, events: List[CalendarEvent]) -> List[CalendarEvent]:
+        """Persist several events in one database round-trip."""
+        self.db.save_events(events)
+        self._invalidate_events()
         return events
 
     def update_schedule_from_text(self, schedule_text: str, week_start: datetime = None) -> Dict[str, Any]:
@@ -113,19 +352,15 @@ class TextCalendarService:
             Summary of updated schedule
         """
         if week_start is None:
-            week_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            # Adjust to Monday
-            week_start = week_start - timedelta(days=week_start.weekday())
+            week_start = self._default_week_start()
 
         week_end = week_start + timedelta(days=7)
 
-        # Clear existing schedule for this week (optional)
-        # For now, we'll just add the new schedule
-
-        events = self.parse_schedule_from_text(schedule_text, week_start)
+        # Clear existing schedule for this week
+        self.db.delete_events_between(self.user_id, week_start, week_end, EventType.PERSONAL.value)
+        self._invalidate_events()
 
-        for event in events:
-            self.create_event(event)
+        events = self._save_events([self._build_schedule_event(schedule_text, week_start)])
 
         return {
             "week_start": week_start.isoformat(),
@@ -147,36 +382,34 @@ class TextCalendarService:
             Text summary of schedule
         """
         if start_date is None:
-            start_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            start_date = _today_midnight()
 
         end_date = start_date + timedelta(days=days)
-        events = self.get_events(start_date, end_date)
+        parts = [f"Schedule from {_ymd(start_date)} to {_ymd(end_date)}:\n\n"]
+
+        # Rows stream in sorted by start time, so each date is one consecutive run
+        for date_key, day_rows in groupby(self._iter_summary_rows(start_date, end_date), key=itemgetter(0)):
+            parts.append(f"**{date_key}**\n")
+            for _, start_time, end_time, title, is_all_day in day_rows:
+                if is_all_day:
+                    parts.append(f"  - All day: {title}\n")
+                else:
+                    parts.append(f"  - {_hm(start_time)} - {_hm(end_time)}: {title}\n")
+            parts.append("\n")
 
-        if not events:
+        if len(parts) == 1:
             return "No scheduled events found."
 
-        summary = f"Schedule from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}:\n\n"
-
-        # Group by date
-        events_by_date = {}
-        for event in events:
-            date_key = event.start_time.strftime('%Y-%m-%d')
-            if date_key not in events_by_date:
-                events_by_date[date_key] = []
-            events_by_date[date_key].append(event)
-
-        # Format summary
-        for date_key in sorted(events_by_date.keys()):
-            summary += f"**{date_key}**\n"
-            for event in sorted(events_by_date[date_key], key=lambda e: e.start_time):
-                if event.is_all_day:
-                    summary += f"  - All day: {event.title}\n"
-                else:
-                    time_range = f"{event.start_time.strftime('%H:%M')} - {event.end_time.strftime('%H:%M')}"
-                    summary += f"  - {time_range}: {event.title}\n"
-            summary += "\n"
+        return "".join(parts)
 
-        return summary
+    def _iter_summary_rows(self, start_date: datetime, end_date: datetime) -> Iterator[tuple]:
+        """
+        Yield (date, start, end, title, is_all_day) rows sorted by start time.
+
+        Rows are streamed from the database, so this path does not go through
+        the get_events cache.
+        """
+        return self.db.iter_events_grouped_by_date(start_date, end_date)
 
     def record_actual_completion(self, task_id: str, completion_text: str, completion_date: datetime = None) -> Dict[str, Any]:
         """
@@ -5,11 +5,26 @@ A user-friendly interface to interact with the AI Task Planning Agent.
 """
 
 import streamlit as st
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import hashlib
 import json
 import os
+import queue
+import re
+import threading
+import time
 from pathlib import Path
 import traceback
+import uuid
+from types import MappingProxyType
+
+from services.ai_planner_multi import AIPlannerService
+from services.text_calendar_service import TextCalendarService
+from services.preference_learner import PreferenceLearner
+from database.db_manager import DatabaseManager
+from models import Task, TaskStatus
 
 # Configure page
 st.set_page_config(
@@ -19,34 +34,138 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Most recent chat messages kept in session memory
+CHAT_HISTORY_LIMIT = 100
+# Messages rendered directly; earlier in-memory ones sit in a collapsed expander
+CHAT_PAGE_SIZE = 40
+# Number of recent chat messages sent to the model with each prompt
+CHAT_CONTEXT_MESSAGES = 12
+# Identical prompts submitted within this many seconds are only sent once
+DUPLICATE_PROMPT_WINDOW = 2.0
+
+
+# Provider configuration, built once at import time
+_PROVIDER_MAP = MappingProxyType({
+    "Anthropic (Claude)": "anthropic",
+    "OpenAI (ChatGPT)": "openai",
+    "Google (Gemini)": "google"
+})
+_API_KEY_LABELS = MappingProxyType({
+    "anthropic": "Anthropic API Key (from console.anthropic.com)",
+    "openai": "OpenAI API Key (from platform.openai.com)",
+    "google": "Google API Key (from ai.google.dev)"
+})
+_API_KEY_ENV_VARS = MappingProxyType({
+    "anthropic": "ANTHROPIC_API_KEY",
+    "openai": "OPENAI_API_KEY",
+    "google": "GOOGLE_API_KEY"
+})
+_MODEL_OPTIONS = MappingProxyType({
+    "anthropic": (
+        "claude-sonnet-4-5-20250929",
+        "claude-opus-4-5-20251101",
+        "claude-3-5-sonnet-20241022"
+    ),
+    "openai": (
+        "gpt-4o",
+        "gpt-4o-mini",
+        "gpt-4-turbo",
+        "gpt-3.5-turbo"
+    ),
+    "google": (
+        "gemini-2.0-flash-exp",
+        "gemini-1.5-pro",
+        "gemini-1.5-flash"
+    )
+})
+_PROVIDER_NAMES = MappingProxyType({
+    "anthropic": "Anthropic Claude",
+    "openai": "OpenAI ChatGPT",
+    "google": "Google Gemini"
+})
+
+# Separator for the comma-separated tags field
+_TAG_RE = re.compile(r"\s*,\s*")
+
+# Welcome screen shown until the agent is configured
+_WELCOME_MD = """
+### Your Conversational AI Productivity Assistant
+
+This intelligent agent helps you through natural conversation:
+- 📝 **Manage tasks** with AI-powered prioritization
+- 🗓️ **Share your schedule** conversationally (no calendar integration needed)
+- 📅 **Generate optimal plans** based on your availability and preferences
+- 🔄 **Learn from your feedback** about what actually happened
+- 📊 **Track insights** and improve productivity week by week
+
+---
+
+### How It Works
+
+1. **Share Your Schedule**: Tell the agent about your week in plain text
+   - "Monday I have meetings 9-11am, Tuesday is mostly free..."
+
+2. **Add Your Tasks**: Describe what you need to accomplish
+
+3. **Get AI Plans**: The agent creates an optimal schedule around your commitments
+
+4. **Weekly Review**: At week's end, tell the agent what you actually did
+   - The agent learns from the differences to improve future plans
+
+---
+
+### Getting Started
+
+1. **Get an API Key**: Choose your preferred provider:
+   - Anthropic Claude: [console.anthropic.com](https://console.anthropic.com/)
+   - OpenAI ChatGPT: [platform.openai.com](https://platform.openai.com/)
+   - Google Gemini: [ai.google.dev](https://ai.google.dev/) (free tier available!)
+
+2. **Configure**: Select provider and enter API key in the sidebar
+
+3. **Start Planning**: Share your schedule and add tasks!
+
+---
+
+### Key Features
+
+- **💬 Conversational Interface**: No complex forms or integrations
+- **🧠 Smart Learning**: Improves from your weekly feedback
+- **📊 Visual Plans**: See your schedule and plans clearly
+- **🎯 Flexible**: Works entirely through text - no calendar API needed
+- **🤖 Multi-Provider**: Choose Claude, ChatGPT, or Gemini
+
+👈 **Configure your agent in the sidebar to begin!**
+"""
+
 # Initialize session state
 if "configured" not in st.session_state:
     st.session_state.configured = False
 if "agent" not in st.session_state:
     st.session_state.agent = None
 if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
+    st.session_state.chat_history = deque(maxlen=CHAT_HISTORY_LIMIT)
+if "chat_archive" not in st.session_state:
+    st.session_state.chat_archive = []
+if "insights_blob" not in st.session_state:
+    st.session_state.insights_blob = {}
+if "chat_loaded" not in st.session_state:
+    st.session_state.chat_loaded = False
+if "chat_has_older" not in st.session_state:
+    st.session_state.chat_has_older = False
 if "current_plan" not in st.session_state:
     st.session_state.current_plan = None
+if "plan_job" not in st.session_state:
+    st.session_state.plan_job = None
 if "user_id" not in st.session_state:
     st.session_state.user_id = "streamlit_user"
 
-def save_env_config(provider: str, api_key: str, model_name: str):
-    """Save configuration to .env file"""
-    env_path = Path(".env")
-
-    # Determine which API key to set
-    api_keys = {
-        "ANTHROPIC_API_KEY": api_key if provider == "anthropic" else "",
-        "OPENAI_API_KEY": api_key if provider == "openai" else "",
-        "GOOGLE_API_KEY": api_key if provider == "google" else ""
-    }
-
-    env_content = f"""# AI Task Planning Agent Configuration
+# .env contents; API keys for providers other than the selected one stay blank
+_ENV_TEMPLATE = """# AI Task Planning Agent Configuration
 AI_PROVIDER={provider}
-ANTHROPIC_API_KEY={api_keys["ANTHROPIC_API_KEY"]}
-OPENAI_API_KEY={api_keys["OPENAI_API_KEY"]}
-GOOGLE_API_KEY={api_keys["GOOGLE_API_KEY"]}
+ANTHROPIC_API_KEY={ANTHROPIC_API_KEY}
+OPENAI_API_KEY={OPENAI_API_KEY}
+GOOGLE_API_KEY={GOOGLE_API_KEY}
 MODEL_NAME={model_name}
 MAX_TOKENS=4096
 TEMPERATURE=0.7
@@ -66,101 +185,492 @@ DEFAULT_TIMEZONE=UTC
 MONITORING_INTERVAL_MINUTES=15
 LEARNING_MODE=enabled
 """
-    env_path.write_text(env_content)
+
+def save_env_config(provider: str, api_key: str, model_name: str):
+    """Save configuration to .env file"""
+    env_path = Path(".env")
+
+    values = defaultdict(str, {
+        _API_KEY_ENV_VARS[provider]: api_key,
+        "provider": provider,
+        "model_name": model_name
+    })
+    env_content = _ENV_TEMPLATE.format_map(values).encode("utf-8")
+
+    # Skip the write when the file already holds exactly this configuration
+    if env_path.exists() and env_path.read_bytes() == env_content:
+        return False
+
+    env_path.write_bytes(env_content)
     return True
 
+def _apply_env_to_process(provider: str, api_key: str, model_name: str):
+    """Expose the configuration to this process through environment variables only"""
+    os.environ["AI_PROVIDER"] = provider
+    os.environ[_API_KEY_ENV_VARS[provider]] = api_key
+    os.environ["MODEL_NAME"] = model_name
+
+class CustomAgent:
+    """Agent-like object backed by the multi-provider planner and text calendar."""
+
+    def __init__(self, user_id, db, ai_planner, calendar_service):
+        self.user_id = user_id
+        self.db = db
+        self.user_profile = self.db.get_profile(user_id)
+        self.ai_planner = ai_planner
+
+        # Use text-based calendar service (no external API integration)
+        self.calendar_service = calendar_service
+        self.preference_learner = PreferenceLearner()
+        self.monitoring_active = False
+        self.monitoring_thread = None
+
+    # Delegate methods to maintain compatibility
+    def add_task(self, **kwargs):
+        task = Task(**kwargs)
+        self.db.save_task(task)
+        return task
+
+    def list_tasks(self, status=None, order_by=None):
+        return self.db.get_tasks(self.user_id, status=status, order_by=order_by)
+
+    def mark_task_in_progress(self, task_id):
+        task = self.db.get_task(task_id)
+        if task:
+            task.status = TaskStatus.IN_PROGRESS
+            return self.db.save_task(task)
+        return None
+
+    def mark_task_completed(self, task_id):
+        task = self.db.get_task(task_id)
+        if task:
+            task.status = TaskStatus.COMPLETED
+            return self.db.save_task(task)
+        return None
+
+    def generate_plan(self, start_date=None, end_date=None, context=None, snapshot=None):
+        if start_date is None:
+            start_date = datetime.now()
+        if end_date is None:
+            end_date = start_date + timedelta(days=14)
+
+        # Pending tasks, events and the profile come from one database session
+        if snapshot is None:
+            snapshot = self.db.get_planning_snapshot(self.user_id, start_date, end_date)
+        self.user_profile = snapshot.profile
+        return self.ai_planner.generate_plan(snapshot.tasks, snapshot.events, snapshot.profile, context)
+
+    def refine_plan(self, feedback, current_plan):
+        return self.ai_planner.refine_plan(feedback, current_plan)
+
+    def execute_plan(self, plan):
+        # Create events using text calendar service
+        events = self.calendar_service.create_events_from_plan(plan.get('scheduled_tasks', []))
+        return events
+
+    def get_insights(self):
+        return self.preference_learner.get_insights(self.user_id, self.db)
+
+    def dashboard_snapshot(self):
+        """Tasks, status counts and insights gathered together for the dashboard views"""
+        tasks = self.list_tasks()
+        snapshot = {
+            "tasks": tasks,
+            "stats": dict(Counter(t.status for t in tasks)),
+            "insights": None,
+            "insights_error": None,
+        }
+        try:
+            snapshot["insights"] = self.get_insights()
+        except Exception as e:
+            snapshot["insights_error"] = str(e)
+        return snapshot
+
+    def update_schedule(self, schedule_text, week_start=None):
+        """Update weekly schedule from text"""
+        return self.calendar_service.update_schedule_from_text(schedule_text, week_start)
+
+    def get_schedule_summary(self, start_date=None, days=7):
+        """Get text summary of schedule"""
+        return self.calendar_service.get_schedule_summary(start_date, days)
+
+    def record_completion(self, task_id, completion_text, completion_date=None):
+        """Record actual task completion"""
+        return self.calendar_service.record_actual_completion(task_id, completion_text, completion_date)
+
+
+class ChatLogWriter:
+    """
+    Persists chat messages from a background thread.
+
+    The UI only puts messages on a queue; a daemon thread writes them with one
+    INSERT per batch of up to BATCH_SIZE messages or BATCH_WINDOW seconds.
+    """
+
+    BATCH_SIZE = 50
+    BATCH_WINDOW = 0.5
+
+    def __init__(self, db):
+        self.db = db
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="chat-log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, user_id, role, content, ts=None):
+        """Queue one message for writing"""
+        self._queue.put((user_id, role, content, ts or datetime.utcnow()))
+
+    def flush(self):
+        """Block until every queued message has been written"""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.BATCH_WINDOW
+            while len(batch) < self.BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self.db.append_chat_messages(batch)
+            except Exception as e:
+                print(f"Error saving chat messages: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+class CacheVersions:
+    """
+    Per-user version counters for the st.cache_data loaders.
+
+    The cached data is shared by every session in the process, so the counters
+    are too: a write in one session bumps the version every other session of
+    that user reads on its next rerun.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = Counter()
+
+    def get(self, user_id, kind):
+        with self._lock:
+            return self._versions[(user_id, kind)]
+
+    def bump(self, user_id, *kinds):
+        with self._lock:
+            for kind in kinds:
+                self._versions[(user_id, kind)] += 1
+
+
+# Each service is built once per server process and shared across reruns and sessions
+@st.cache_resource(show_spinner=False)
+def _get_db() -> DatabaseManager:
+    return DatabaseManager()
+
+
+@st.cache_resource(show_spinner=False)
+def _get_calendar(user_id: str) -> TextCalendarService:
+    return TextCalendarService(user_id=user_id, db_manager=_get_db())
+
+
+@st.cache_resource(show_spinner=False)
+def _get_chat_writer() -> ChatLogWriter:
+    return ChatLogWriter(_get_db())
+
+
+@st.cache_resource(show_spinner=False)
+def _get_executor() -> ThreadPoolExecutor:
+    """Runs plan execution and refinement off the script thread"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="plan-job")
+
+
+@st.cache_resource(show_spinner=False)
+def _get_cache_versions() -> CacheVersions:
+    return CacheVersions()
+
+
+def _new_agent(user_id: str, provider: str, api_key: str, model_name: str) -> CustomAgent:
+    """
+    Agent for one browser session, kept in st.session_state.
+
+    The planner carries that session's conversation history, so it is not
+    shared; the database, calendar and the planner's HTTP client are.
+    """
+    return CustomAgent(
+        user_id,
+        db=_get_db(),
+        ai_planner=AIPlannerService(provider=provider, api_key=api_key, model_name=model_name),
+        calendar_service=_get_calendar(user_id)
+    )
+
+
+def _debug_traceback():
+    """Traceback of the exception being handled, or None unless debug mode is on"""
+    if st.session_state.get("debug_mode"):
+        return traceback.format_exc()
+    return None
+
+
 def initialize_agent(user_id: str, provider: str = "anthropic", api_key: str = None, model_name: str = None):
     """Initialize the AI Task Planning Agent with custom provider"""
     try:
-        # Import the multi-provider service
-        from services.ai_planner_multi import AIPlannerService
-        from database.db_manager import DatabaseManager
-
-        # Create a custom agent-like object
-        class CustomAgent:
-            def __init__(self, user_id, provider, api_key, model_name):
-                self.user_id = user_id
-                self.db = DatabaseManager()
-                self.user_profile = self.db.get_profile(user_id)
-                self.ai_planner = AIPlannerService(provider=provider, api_key=api_key, model_name=model_name)
-
-                # Import other services
-                from services.text_calendar_service import TextCalendarService
-                from services.preference_learner import PreferenceLearner
-
-                # Use text-based calendar service (no external API integration)
-                self.calendar_service = TextCalendarService(user_id=user_id, db_manager=self.db)
-                self.preference_learner = PreferenceLearner()
-                self.monitoring_active = False
-                self.monitoring_thread = None
-
-            # Delegate methods to maintain compatibility
-            def add_task(self, **kwargs):
-                from models import Task, Priority
-                task = Task(**kwargs)
-                self.db.save_task(task)
-                return task
-
-            def list_tasks(self, status=None):
-                # Use get_all_tasks instead of get_tasks
-                return self.db.get_all_tasks(status=status)
-
-            def mark_task_in_progress(self, task_id):
-                from models import TaskStatus
-                task = self.db.get_task(task_id)
-                if task:
-                    task.status = TaskStatus.IN_PROGRESS
-                    return self.db.save_task(task)
-                return None
-
-            def mark_task_completed(self, task_id):
-                from models import TaskStatus
-                task = self.db.get_task(task_id)
-                if task:
-                    task.status = TaskStatus.COMPLETED
-                    return self.db.save_task(task)
-                return None
-
-            def generate_plan(self, start_date=None, end_date=None, context=None):
-                from datetime import datetime, timedelta
-                if start_date is None:
-                    start_date = datetime.now()
-                if end_date is None:
-                    end_date = start_date + timedelta(days=14)
-
-                tasks = self.db.get_tasks(self.user_id, status="pending")
-                calendar_events = self.calendar_service.get_events(start_date, end_date)
-                return self.ai_planner.generate_plan(tasks, calendar_events, self.user_profile, context)
-
-            def refine_plan(self, feedback, current_plan):
-                return self.ai_planner.refine_plan(feedback, current_plan)
-
-            def execute_plan(self, plan):
-                from datetime import datetime
-                # Create events using text calendar service
-                events = self.calendar_service.create_events_from_plan(plan.get('scheduled_tasks', []))
-                return events
-
-            def get_insights(self):
-                return self.preference_learner.get_insights(self.user_id, self.db)
-
-            def update_schedule(self, schedule_text, week_start=None):
-                """Update weekly schedule from text"""
-                return self.calendar_service.update_schedule_from_text(schedule_text, week_start)
-
-            def get_schedule_summary(self, start_date=None, days=7):
-                """Get text summary of schedule"""
-                return self.calendar_service.get_schedule_summary(start_date, days)
-
-            def record_completion(self, task_id, completion_text, completion_date=None):
-                """Record actual task completion"""
-                return self.calendar_service.record_actual_completion(task_id, completion_text, completion_date)
-
-        agent = CustomAgent(user_id, provider, api_key, model_name)
+        agent = _new_agent(user_id, provider, api_key, model_name)
         return agent, None
     except Exception as e:
-        import traceback
-        return None, f"{str(e)}\n{traceback.format_exc()}"
+        details = _debug_traceback()
+        return None, f"{str(e)}\n{details}" if details else str(e)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_tasks(user_id: str, version: int, order_by: str = None):
+    """All tasks for a user, sorted by the database, with per-status counts; a new version forces a reload"""
+    tasks = _get_db().get_tasks(user_id, order_by=order_by)
+    return tasks, Counter(t.status for t in tasks)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _cached_insights(user_id: str, version: int):
+    """Insights for a user and their JSON text, serialized once per insights version"""
+    insights = st.session_state.agent.get_insights()
+    return insights, json.dumps(insights, indent=2, default=str)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_refinement_patterns(user_id: str, version: int):
+    """Refinement pattern analysis for a user; a saved refinement bumps the insights version"""
+    db = _get_db()
+    # New users have nothing to analyze, so a COUNT probe skips the grouping query
+    if not db.count_plan_refinements(user_id):
+        return {"total_refinements": 0, "patterns": []}
+    return db.analyze_refinement_patterns(user_id)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_dashboard(user_id: str):
+    """Dashboard snapshot for a user, cached until a task mutation clears it"""
+    return st.session_state.agent.dashboard_snapshot()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_summary(user_id: str, start_iso: str, days: int, version: int):
+    """Schedule summary text for a week, cached until the schedule changes"""
+    return st.session_state.agent.get_schedule_summary(datetime.fromisoformat(start_iso), days)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_events(user_id: str, start_iso: str, end_iso: str, version: int):
+    """Calendar events in a date range, cached until the schedule changes"""
+    return st.session_state.agent.calendar_service.get_events(
+        datetime.fromisoformat(start_iso), datetime.fromisoformat(end_iso)
+    )
+
+
+def _with_parsed_times(plan):
+    """Parse each scheduled task's ISO timestamps once and keep them on the plan as _start_dt/_end_dt"""
+    for scheduled in plan.get('scheduled_tasks', []):
+        scheduled['_start_dt'] = datetime.fromisoformat(scheduled['scheduled_start'])
+        scheduled['_end_dt'] = datetime.fromisoformat(scheduled['scheduled_end'])
+    return plan
+
+
+def _without_parsed_times(plan):
+    """Copy of a plan without the _start_dt/_end_dt datetimes, e.g. for JSON storage"""
+    return {
+        **plan,
+        'scheduled_tasks': [
+            {key: value for key, value in scheduled.items() if key not in ('_start_dt', '_end_dt')}
+            for scheduled in plan.get('scheduled_tasks', [])
+        ],
+    }
+
+
+def _refine_and_record(agent, feedback, plan):
+    """Refine a plan and save the request with both plans in one insert, for learning"""
+    refined = agent.refine_plan(feedback, plan)
+    agent.db.save_plan_refinement(
+        user_id=agent.user_id,
+        original_plan=_without_parsed_times(plan),
+        refinement_request=feedback,
+        refined_plan=_without_parsed_times(refined),
+        plan_date=datetime.now()
+    )
+    return refined
+
+
+def _context_for_llm(history, k=CHAT_CONTEXT_MESSAGES, summarizer=None):
+    """Last k chat messages, preceded by a summary of older ones if a summarizer is given"""
+    # Send only role and content; stored messages also carry database fields
+    history = list(history)
+    recent = [{"role": m["role"], "content": m["content"]} for m in history[-k:]]
+    older = history[:-k]
+    if older and summarizer:
+        return [{"role": "system", "content": "Earlier: " + summarizer(older)}] + recent
+    return recent
+
+
+def _is_duplicate_prompt(prompt):
+    """True if the same prompt was already sent within DUPLICATE_PROMPT_WINDOW seconds"""
+    digest = hashlib.blake2b(prompt.encode(), digest_size=8).hexdigest()
+    now = time.time()
+    if (st.session_state.get("_last_prompt") == digest
+            and now - st.session_state.get("_last_prompt_ts", 0) < DUPLICATE_PROMPT_WINDOW):
+        return True
+
+    st.session_state._last_prompt = digest
+    st.session_state._last_prompt_ts = now
+    return False
+
+
+def _invalidate_task_caches():
+    """Bump the task list and insights versions and drop the dashboard after tasks or events change"""
+    _get_cache_versions().bump(st.session_state.user_id, "tasks", "insights")
+    _cached_dashboard.clear()
+
+
+def _append_chat(role, content, insights=None):
+    """
+    Add a message to the in-memory chat window and queue it for the database.
+
+    An insights dict is kept in st.session_state.insights_blob and the
+    message only holds a reference to it; the database keeps the message text.
+    """
+    message = {"role": role, "content": content}
+    if st.session_state.agent is not None:
+        _get_chat_writer().put(st.session_state.user_id, role, content)
+
+    if insights is not None:
+        # A module-level counter would restart on every rerun, so refs are random
+        ref = uuid.uuid4().hex
+        st.session_state.insights_blob[ref] = insights
+        message["insights_ref"] = ref
+
+    # The deque drops its oldest message when full; that one stays on disk
+    history = st.session_state.chat_history
+    if len(history) == history.maxlen:
+        dropped = history[0]
+        st.session_state.insights_blob.pop(dropped.get("insights_ref"), None)
+        st.session_state.chat_has_older = True
+    history.append(message)
+
+
+def _render_chat_message(msg):
+    with st.chat_message(msg["role"]):
+        st.markdown(msg["content"])
+        insights = st.session_state.insights_blob.get(msg.get("insights_ref"))
+        if insights is not None:
+            st.json(insights)
+
+
+# Button callbacks: they run before the next script pass, so no st.rerun() is needed
+def _reset_configuration():
+    st.session_state.configured = False
+    st.session_state.agent = None
+    st.session_state.chat_history = deque(maxlen=CHAT_HISTORY_LIMIT)
+    st.session_state.chat_archive = []
+    st.session_state.chat_loaded = False
+
+
+def _show_older_messages(agent):
+    # Queued messages have to be on disk before paging past them
+    _get_chat_writer().flush()
+    archive = st.session_state.chat_archive
+    if archive:
+        older = agent.db.get_recent_messages(st.session_state.user_id, CHAT_PAGE_SIZE, before_id=archive[0]["id"])
+    else:
+        # The chat window holds the newest messages, so skip exactly that many
+        older = agent.db.get_recent_messages(
+            st.session_state.user_id, CHAT_PAGE_SIZE, offset=len(st.session_state.chat_history)
+        )
+
+    st.session_state.chat_archive = older + st.session_state.chat_archive
+    st.session_state.chat_has_older = len(older) == CHAT_PAGE_SIZE
+
+
+def _clear_chat():
+    if not (st.session_state.chat_history or st.session_state.chat_archive or st.session_state.chat_has_older):
+        return
+
+    _get_chat_writer().flush()
+    st.session_state.agent.db.clear_chat_messages(st.session_state.user_id)
+    st.session_state.chat_history = deque(maxlen=CHAT_HISTORY_LIMIT)
+    st.session_state.chat_archive = []
+    st.session_state.insights_blob = {}
+    st.session_state.chat_has_older = False
+
+
+def _post_task_list():
+    tasks = _cached_dashboard(st.session_state.user_id)["tasks"]
+    if tasks:
+        lines = [f"- [{t.priority}] {t.title} ({t.status})" for t in tasks]
+        response = "**Current Tasks:**\n\n" + "\n".join(lines)
+    else:
+        response = "No tasks found. Add some tasks to get started!"
+
+    _append_chat("assistant", response)
+
+
+def _post_insights():
+    snapshot = _cached_dashboard(st.session_state.user_id)
+    if snapshot["insights_error"]:
+        _append_chat("assistant", f"Error getting insights: {snapshot['insights_error']}")
+    else:
+        _append_chat("assistant", "**Productivity Insights:**", insights=snapshot["insights"])
+
+
+def _add_task(agent):
+    """Create a task from the add-task form; the outcome is shown on the next pass"""
+    form = st.session_state
+    if not form.new_task_title:
+        form.add_task_notice = ("error", "Task title is required", None)
+        return
+
+    try:
+        deadline_days = form.new_task_deadline_days
+        deadline = datetime.now() + timedelta(days=deadline_days) if deadline_days > 0 else None
+        # Split on commas (with surrounding whitespace) and drop empty or repeated tags
+        task_tags = list(dict.fromkeys(tag for tag in _TAG_RE.split(form.new_task_tags.strip()) if tag))
+
+        task = agent.add_task(
+            title=form.new_task_title,
+            description=form.new_task_description,
+            priority=form.new_task_priority,
+            estimated_duration=form.new_task_duration,
+            deadline=deadline,
+            requires_deep_focus=form.new_task_focus,
+            can_split=form.new_task_split,
+            tags=task_tags
+        )
+
+        _invalidate_task_caches()
+        form.add_task_notice = ("success", f"✅ Task '{task.title}' added successfully!", None)
+
+    except Exception as e:
+        form.add_task_notice = ("error", f"Error adding task: {e}", _debug_traceback())
+
+
+def _refresh_insights():
+    _get_cache_versions().bump(st.session_state.user_id, "insights")
+
+
+def _start_task(agent, task_id):
+    if agent.mark_task_in_progress(task_id) is not None:
+        _invalidate_task_caches()
+
+
+def _complete_task(agent, task_id):
+    if agent.mark_task_completed(task_id) is not None:
+        _invalidate_task_caches()
+
+
+def _clear_plan():
+    st.session_state.current_plan = None
 
 # Sidebar - Configuration
 with st.sidebar:
@@ -174,27 +684,15 @@ with st.sidebar:
             # AI Provider Selection
             ai_provider = st.selectbox(
                 "AI Provider",
-                options=["Anthropic (Claude)", "OpenAI (ChatGPT)", "Google (Gemini)"],
+                options=list(_PROVIDER_MAP),
                 help="Select which AI provider to use"
             )
 
-            # Map display names to provider codes
-            provider_map = {
-                "Anthropic (Claude)": "anthropic",
-                "OpenAI (ChatGPT)": "openai",
-                "Google (Gemini)": "google"
-            }
-            provider_code = provider_map[ai_provider]
+            provider_code = _PROVIDER_MAP[ai_provider]
 
             # API Key input with dynamic label
-            api_key_labels = {
-                "anthropic": "Anthropic API Key (from console.anthropic.com)",
-                "openai": "OpenAI API Key (from platform.openai.com)",
-                "google": "Google API Key (from ai.google.dev)"
-            }
-
             api_key = st.text_input(
-                api_key_labels[provider_code],
+                _API_KEY_LABELS[provider_code],
                 type="password",
                 help=f"Enter your {ai_provider} API key"
             )
@@ -206,31 +704,18 @@ with st.sidebar:
             )
 
             # Model selection based on provider
-            model_options = {
-                "anthropic": [
-                    "claude-sonnet-4-5-20250929",
-                    "claude-opus-4-5-20251101",
-                    "claude-3-5-sonnet-20241022"
-                ],
-                "openai": [
-                    "gpt-4o",
-                    "gpt-4o-mini",
-                    "gpt-4-turbo",
-                    "gpt-3.5-turbo"
-                ],
-                "google": [
-                    "gemini-2.0-flash-exp",
-                    "gemini-1.5-pro",
-                    "gemini-1.5-flash"
-                ]
-            }
-
             model_name = st.selectbox(
                 "Model",
-                options=model_options[provider_code],
+                options=_MODEL_OPTIONS[provider_code],
                 help="Select the AI model to use"
             )
 
+            persist_env = st.checkbox(
+                "Persist to .env",
+                value=False,
+                help="Also write this configuration, including the API key, to the .env file"
+            )
+
             submit = st.form_submit_button("💾 Save & Initialize", use_container_width=True)
 
             if submit:
@@ -238,8 +723,11 @@ with st.sidebar:
                     st.error("Please provide an API key")
                 else:
                     with st.spinner("Saving configuration and initializing agent..."):
-                        # Save to .env
-                        save_env_config(provider_code, api_key, model_name)
+                        _apply_env_to_process(provider_code, api_key, model_name)
+
+                        # Only touch .env when asked to
+                        if persist_env:
+                            save_env_config(provider_code, api_key, model_name)
 
                         # No need to reload settings - we pass the values directly to the agent
                         # Initialize agent with custom provider
@@ -257,24 +745,16 @@ with st.sidebar:
                             st.rerun()
     else:
         st.success("✅ Agent Ready")
-        st.markdown(f"**User:** {st.session_state.user_id}")
 
-        # Show provider info
+        # User, provider and model info in one block
+        agent_info = [f"**User:** {st.session_state.user_id}"]
         if "provider" in st.session_state:
-            provider_names = {
-                "anthropic": "Anthropic Claude",
-                "openai": "OpenAI ChatGPT",
-                "google": "Google Gemini"
-            }
-            st.markdown(f"**Provider:** {provider_names.get(st.session_state.provider, 'Unknown')}")
-
+            agent_info.append(f"**Provider:** {_PROVIDER_NAMES.get(st.session_state.provider, 'Unknown')}")
         if "model" in st.session_state:
-            st.markdown(f"**Model:** {st.session_state.model}")
+            agent_info.append(f"**Model:** {st.session_state.model}")
+        st.markdown("  \n".join(agent_info))
 
-        if st.button("🔄 Reconfigure", use_container_width=True):
-            st.session_state.configured = False
-            st.session_state.agent = None
-            st.rerun()
+        st.button("🔄 Reconfigure", use_container_width=True, on_click=_reset_configuration)
 
     st.markdown("---")
 
@@ -289,598 +769,641 @@ with st.sidebar:
     else:
         page = None
 
-# Main content area
-if not st.session_state.configured:
-    # Welcome screen
-    st.title("Welcome to AI Task Planning Agent 🤖")
-    st.markdown("""
-    ### Your Conversational AI Productivity Assistant
-
-    This intelligent agent helps you through natural conversation:
-    - 📝 **Manage tasks** with AI-powered prioritization
-    - 🗓️ **Share your schedule** conversationally (no calendar integration needed)
-    - 📅 **Generate optimal plans** based on your availability and preferences
-    - 🔄 **Learn from your feedback** about what actually happened
-    - 📊 **Track insights** and improve productivity week by week
-
-    ---
-
-    ### How It Works
-
-    1. **Share Your Schedule**: Tell the agent about your week in plain text
-       - "Monday I have meetings 9-11am, Tuesday is mostly free..."
-
-    2. **Add Your Tasks**: Describe what you need to accomplish
+    st.checkbox("Debug mode", key="debug_mode", help="Show full tracebacks with error messages")
+
+# ==================== CHAT PAGE ====================
+def _chat_page(agent):
+    st.title("💬 Chat with Your AI Agent")
+    st.markdown("Ask questions, add tasks, or request plans using natural language.")
+
+    # Load the most recent persisted messages once per session
+    if not st.session_state.chat_loaded:
+        _get_chat_writer().flush()
+        recent = agent.db.get_recent_messages(st.session_state.user_id, CHAT_HISTORY_LIMIT)
+        st.session_state.chat_history = deque(recent, maxlen=CHAT_HISTORY_LIMIT)
+        st.session_state.chat_has_older = len(recent) == CHAT_HISTORY_LIMIT
+        st.session_state.chat_loaded = True
+
+    # Chat container
+    chat_container = st.container()
+
+    with chat_container:
+        history = list(st.session_state.chat_history)
+        earlier = st.session_state.chat_archive + history[:-CHAT_PAGE_SIZE]
+
+        # Earlier messages stay collapsed; even older ones are paged in from the database
+        if earlier or st.session_state.chat_has_older:
+            with st.expander(f"Show older messages ({len(earlier)})"):
+                if st.session_state.chat_has_older:
+                    st.button("⬆️ Load older messages", on_click=_show_older_messages, args=(agent,))
+                for msg in earlier:
+                    _render_chat_message(msg)
+
+        # Display chat history
+        for msg in history[-CHAT_PAGE_SIZE:]:
+            _render_chat_message(msg)
+
+    # Chat input
+    prompt = st.chat_input("Ask your agent anything...")
+    if prompt and not _is_duplicate_prompt(prompt):
+        # Window the transcript before the new prompt is added to it
+        context = _context_for_llm(st.session_state.chat_history)
+
+        # Add user message
+        _append_chat("user", prompt)
 
-    3. **Get AI Plans**: The agent creates an optimal schedule around your commitments
+        with chat_container:
+            with st.chat_message("user"):
+                st.markdown(prompt)
 
-    4. **Weekly Review**: At week's end, tell the agent what you actually did
-       - The agent learns from the differences to improve future plans
+            with st.chat_message("assistant"):
+                message_placeholder = st.empty()
 
-    ---
+                try:
+                    # Process user input through AI, streaming tokens as they arrive
+                    if hasattr(agent.ai_planner, "chat_stream"):
+                        response = message_placeholder.write_stream(
+                            agent.ai_planner.chat_stream(prompt, context=context)
+                        )
+                    else:
+                        response = agent.ai_planner.chat(prompt, context=context)
+                        message_placeholder.markdown(response)
 
-    ### Getting Started
+                    # Store in history
+                    _append_chat("assistant", response)
 
-    1. **Get an API Key**: Choose your preferred provider:
-       - Anthropic Claude: [console.anthropic.com](https://console.anthropic.com/)
-       - OpenAI ChatGPT: [platform.openai.com](https://platform.openai.com/)
-       - Google Gemini: [ai.google.dev](https://ai.google.dev/) (free tier available!)
+                except Exception as e:
+                    error_msg = f"Error: {str(e)}"
+                    _append_chat("assistant", error_msg)
+                    message_placeholder.error(error_msg)
 
-    2. **Configure**: Select provider and enter API key in the sidebar
+    # Quick actions
+    st.markdown("---")
+    st.subheader("Quick Actions")
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.button("📋 List all tasks", use_container_width=True, on_click=_post_task_list)
+
+    with col2:
+        st.button("📊 Show insights", use_container_width=True, on_click=_post_insights)
+
+    with col3:
+        st.button("🔄 Clear chat", use_container_width=True, on_click=_clear_chat)
+
+
+# ==================== TASKS PAGE ====================
+def _render_task_detail(agent, task_id):
+    """Details and actions for one task; its buttons rerun the whole Tasks page fragment"""
+    task = agent.db.get_task(task_id)
+    if task is None:
+        st.info("This task no longer exists.")
+        return
+
+    with st.container(border=True):
+        st.markdown(f"{'✅' if task.status == 'completed' else '📌'} **[{task.priority.upper()}] {task.title}**")
+
+        # One markdown block for all the fields instead of one element per line
+        details = [
+            f"**Description:** {task.description or 'No description'}",
+            f"**Status:** `{task.status}`",
+            f"**Duration:** {task.estimated_duration} hours",
+        ]
+        if task.deadline:
+            details.append(f"**Deadline:** {task.deadline.strftime('%Y-%m-%d %H:%M')}")
+        if task.tags:
+            details.append(f"**Tags:** {', '.join(task.tags)}")
+        details.append(
+            "**Preferences:**\n"
+            f"- Deep Focus Required: {'Yes' if task.requires_deep_focus else 'No'}\n"
+            f"- Can Split: {'Yes' if task.can_split else 'No'}"
+        )
+        st.markdown("\n\n".join(details))
 
-    3. **Start Planning**: Share your schedule and add tasks!
+        # Action buttons
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if task.status == "pending":
+                st.button("▶️ Start", key=f"start_{task.id}", on_click=_start_task, args=(agent, task.id))
+        with col2:
+            if task.status != "completed":
+                st.button("✅ Complete", key=f"complete_{task.id}", on_click=_complete_task, args=(agent, task.id))
 
-    ---
 
-    ### Key Features
+@st.fragment
+def _tasks_page(agent):
+    st.title("📝 Task Management")
 
-    - **💬 Conversational Interface**: No complex forms or integrations
-    - **🧠 Smart Learning**: Improves from your weekly feedback
-    - **📊 Visual Plans**: See your schedule and plans clearly
-    - **🎯 Flexible**: Works entirely through text - no calendar API needed
-    - **🤖 Multi-Provider**: Choose Claude, ChatGPT, or Gemini
+    # One cached query feeds both the statistics and the task table
+    sort_by = st.session_state.get("tasks_sort_by", "Priority")
+    all_tasks, counts = _load_tasks(agent.user_id, _get_cache_versions().get(agent.user_id, "tasks"),
+                                    sort_by.lower())
 
-    👈 **Configure your agent in the sidebar to begin!**
-    """)
+    col1, col2 = st.columns([2, 1])
 
-else:
-    agent = st.session_state.agent
+    with col1:
+        st.subheader("Add New Task")
 
-    # ==================== CHAT PAGE ====================
-    if page == "💬 Chat":
-        st.title("💬 Chat with Your AI Agent")
-        st.markdown("Ask questions, add tasks, or request plans using natural language.")
+        with st.form("add_task_form"):
+            st.text_input("Task Title *", placeholder="e.g., Complete project report", key="new_task_title")
+            st.text_area("Description", placeholder="Additional details...", key="new_task_description")
 
-        # Chat container
-        chat_container = st.container()
+            col_a, col_b, col_c = st.columns(3)
+            with col_a:
+                st.selectbox("Priority", ["low", "medium", "high", "urgent"], key="new_task_priority")
+            with col_b:
+                st.number_input("Duration (hours)", min_value=0.25, value=1.0, step=0.25, key="new_task_duration")
+            with col_c:
+                st.number_input("Deadline (days from now)", min_value=0, value=7, step=1, key="new_task_deadline_days")
 
-        with chat_container:
-            # Display chat history
-            for msg in st.session_state.chat_history:
-                with st.chat_message(msg["role"]):
-                    st.markdown(msg["content"])
+            col_d, col_e = st.columns(2)
+            with col_d:
+                st.checkbox("Requires Deep Focus", key="new_task_focus")
+            with col_e:
+                st.checkbox("Can be Split", value=True, key="new_task_split")
 
-        # Chat input
-        if prompt := st.chat_input("Ask your agent anything..."):
-            # Add user message
-            st.session_state.chat_history.append({"role": "user", "content": prompt})
+            st.text_input("Tags (comma-separated)", placeholder="work, urgent, research", key="new_task_tags")
 
-            with chat_container:
-                with st.chat_message("user"):
-                    st.markdown(prompt)
+            st.form_submit_button("➕ Add Task", use_container_width=True, on_click=_add_task, args=(agent,))
 
-                with st.chat_message("assistant"):
-                    message_placeholder = st.empty()
+            notice = st.session_state.pop("add_task_notice", None)
+            if notice:
+                level, message, details = notice
+                getattr(st, level)(message)
+                if details:
+                    st.code(details)
 
-                    try:
-                        # Process user input through AI
-                        response = agent.ai_planner.chat(prompt)
+    with col2:
+        st.subheader("Task Statistics")
+        st.metric("Total Tasks", len(all_tasks))
+        st.metric("Pending", counts.get("pending", 0))
+        st.metric("In Progress", counts.get("in_progress", 0))
+        st.metric("Completed", counts.get("completed", 0))
 
-                        # Store in history
-                        st.session_state.chat_history.append({
-                            "role": "assistant",
-                            "content": response
-                        })
+    st.markdown("---")
+    st.subheader("Your Tasks")
+
+    # Filter options
+    filter_col1, filter_col2 = st.columns(2)
+    with filter_col1:
+        status_filter = st.selectbox("Filter by Status", ["All", "pending", "in_progress", "completed", "cancelled"])
+    with filter_col2:
+        st.selectbox("Sort by", ["Priority", "Deadline", "Created"], key="tasks_sort_by")
+
+    # Display tasks
+    filtered_tasks = [t for t in all_tasks if status_filter == "All" or t.status == status_filter]
+
+    if filtered_tasks:
+        # One table for the whole list; details are rendered for the selected row only
+        rows = [
+            {
+                "priority": t.priority,
+                "title": t.title,
+                "status": t.status,
+                "deadline": t.deadline,
+                "duration": t.estimated_duration,
+            }
+            for t in filtered_tasks
+        ]
+        table = st.dataframe(
+            rows,
+            key="tasks_table",
+            on_select="rerun",
+            selection_mode="single-row",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "priority": st.column_config.TextColumn("Priority"),
+                "title": st.column_config.TextColumn("Title", width="large"),
+                "status": st.column_config.TextColumn("Status"),
+                "deadline": st.column_config.DatetimeColumn("Deadline", format="YYYY-MM-DD HH:mm"),
+                "duration": st.column_config.NumberColumn("Duration", format="%.2f h"),
+            },
+        )
 
-                        message_placeholder.markdown(response)
+        # The selection survives filter changes, so it may point past the current list
+        selected_rows = [i for i in table.selection.rows if i < len(filtered_tasks)]
+        if not selected_rows:
+            st.caption("Select a task to see its details.")
+        else:
+            _render_task_detail(agent, filtered_tasks[selected_rows[0]].id)
+    else:
+        st.info("No tasks found. Add your first task above!")
 
-                    except Exception as e:
-                        error_msg = f"Error: {str(e)}"
-                        st.session_state.chat_history.append({
-                            "role": "assistant",
-                            "content": error_msg
-                        })
-                        message_placeholder.error(error_msg)
 
-        # Quick actions
-        st.markdown("---")
-        st.subheader("Quick Actions")
-        col1, col2, col3 = st.columns(3)
+# ==================== SCHEDULE PAGE ====================
+@st.fragment
+def _render_schedule_view(agent):
+    """Schedule summary and quick stats; reruns on its own, apart from the forms around it"""
+    st.subheader("📊 Current Schedule View")
 
-        with col1:
-            if st.button("📋 List all tasks", use_container_width=True):
-                tasks = agent.list_tasks()
-                if tasks:
-                    response = "**Current Tasks:**\n\n"
-                    for task in tasks:
-                        response += f"- [{task.priority.value}] {task.title} ({task.status.value})\n"
-                else:
-                    response = "No tasks found. Add some tasks to get started!"
+    # One snapshot of the clock for the whole view
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
 
-                st.session_state.chat_history.append({"role": "assistant", "content": response})
-                st.rerun()
+    col1, col2 = st.columns([2, 1])
 
-        with col2:
-            if st.button("📊 Show insights", use_container_width=True):
-                try:
-                    insights = agent.get_insights()
-                    response = f"**Productivity Insights:**\n\n{json.dumps(insights, indent=2, default=str)}"
-                    st.session_state.chat_history.append({"role": "assistant", "content": response})
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Error getting insights: {e}")
-
-        with col3:
-            if st.button("🔄 Clear chat", use_container_width=True):
-                st.session_state.chat_history = []
-                st.rerun()
-
-    # ==================== TASKS PAGE ====================
-    elif page == "📝 Tasks":
-        st.title("📝 Task Management")
+    with col1:
+        # Get schedule summary
+        try:
+            summary = _cached_summary(agent.user_id, start.isoformat(), 7,
+                                      _get_cache_versions().get(agent.user_id, "schedule"))
+            st.markdown(summary)
+        except Exception as e:
+            st.info("No schedule data available. Update your schedule above.")
 
-        col1, col2 = st.columns([2, 1])
+    with col2:
+        st.subheader("Quick Stats")
+        try:
+            events = _cached_events(agent.user_id, start.isoformat(),
+                                    (start + timedelta(days=7)).isoformat(),
+                                    _get_cache_versions().get(agent.user_id, "schedule"))
 
-        with col1:
-            st.subheader("Add New Task")
+            st.metric("Scheduled Events", len(events))
+            st.metric("This Week", f"{start.strftime('%b %d')} - {(start + timedelta(days=6)).strftime('%b %d')}")
 
-            with st.form("add_task_form"):
-                title = st.text_input("Task Title *", placeholder="e.g., Complete project report")
-                description = st.text_area("Description", placeholder="Additional details...")
+        except Exception as e:
+            st.info("Add schedule data to see stats")
 
-                col_a, col_b, col_c = st.columns(3)
-                with col_a:
-                    priority = st.selectbox("Priority", ["low", "medium", "high", "urgent"])
-                with col_b:
-                    duration = st.number_input("Duration (hours)", min_value=0.25, value=1.0, step=0.25)
-                with col_c:
-                    deadline_days = st.number_input("Deadline (days from now)", min_value=0, value=7, step=1)
 
-                col_d, col_e = st.columns(2)
-                with col_d:
-                    requires_focus = st.checkbox("Requires Deep Focus")
-                with col_e:
-                    can_split = st.checkbox("Can be Split", value=True)
+@st.fragment
+def _schedule_page(agent):
+    now = datetime.now()
+    st.title("🗓️ Weekly Schedule Management")
+    st.markdown("Share your weekly schedule through conversation and visualize your plans.")
 
-                tags = st.text_input("Tags (comma-separated)", placeholder="work, urgent, research")
+    # Schedule input section
+    st.subheader("📥 Update Your Weekly Schedule")
+    st.markdown("Tell me about your weekly schedule in natural language. Include meetings, commitments, and any fixed time blocks.")
 
-                submitted = st.form_submit_button("➕ Add Task", use_container_width=True)
+    with st.form("schedule_input_form"):
+        schedule_text = st.text_area(
+            "Describe your schedule for this week",
+            placeholder="""Example:
+Monday: Team meeting 9-10am, lunch 12-1pm, client call 3-4pm
+Tuesday: Free morning, workshop 2-5pm
+Wednesday: All day conference
+Thursday: Morning meetings 9-11am, afternoon free
+Friday: Sprint planning 10-11am, rest of day flexible
+Weekend: Personal time, no work""",
+            height=200
+        )
 
-                if submitted:
-                    if not title:
-                        st.error("Task title is required")
-                    else:
-                        try:
-                            deadline = datetime.now() + timedelta(days=deadline_days) if deadline_days > 0 else None
-                            task_tags = [t.strip() for t in tags.split(",")] if tags else []
-
-                            task = agent.add_task(
-                                title=title,
-                                description=description,
-                                priority=priority,
-                                estimated_duration=duration,
-                                deadline=deadline,
-                                requires_deep_focus=requires_focus,
-                                can_split=can_split,
-                                tags=task_tags
-                            )
-
-                            st.success(f"✅ Task '{task.title}' added successfully!")
-                            st.rerun()
+        week_start_date = st.date_input(
+            "Week starting from",
+            value=now.date() - timedelta(days=now.weekday())
+        )
 
-                        except Exception as e:
-                            st.error(f"Error adding task: {e}")
-                            st.code(traceback.format_exc())
+        submit_schedule = st.form_submit_button("💾 Update Schedule", use_container_width=True)
 
-        with col2:
-            st.subheader("Task Statistics")
-            tasks = agent.list_tasks()
+        if submit_schedule and schedule_text:
+            try:
+                week_start = datetime.combine(week_start_date, datetime.min.time())
+                result = agent.update_schedule(schedule_text, week_start)
+                _get_cache_versions().bump(agent.user_id, "schedule")
+                st.success(f"✅ {result['message']}")
+            except Exception as e:
+                st.error(f"Error updating schedule: {e}")
 
-            # Count by status
-            pending = len([t for t in tasks if t.status.value == "pending"])
-            in_progress = len([t for t in tasks if t.status.value == "in_progress"])
-            completed = len([t for t in tasks if t.status.value == "completed"])
+    st.markdown("---")
 
-            st.metric("Total Tasks", len(tasks))
-            st.metric("Pending", pending)
-            st.metric("In Progress", in_progress)
-            st.metric("Completed", completed)
+    # Schedule visualization section
+    _render_schedule_view(agent)
 
-        st.markdown("---")
-        st.subheader("Your Tasks")
-
-        # Filter options
-        filter_col1, filter_col2 = st.columns(2)
-        with filter_col1:
-            status_filter = st.selectbox("Filter by Status", ["All", "pending", "in_progress", "completed", "cancelled"])
-        with filter_col2:
-            sort_by = st.selectbox("Sort by", ["Priority", "Deadline", "Created"])
-
-        # Display tasks
-        filtered_tasks = agent.list_tasks(status=None if status_filter == "All" else status_filter)
-
-        if filtered_tasks:
-            for task in filtered_tasks:
-                with st.expander(f"{'✅' if task.status.value == 'completed' else '📌'} [{task.priority.value.upper()}] {task.title}"):
-                    st.markdown(f"**Description:** {task.description or 'No description'}")
-                    st.markdown(f"**Status:** `{task.status.value}`")
-                    st.markdown(f"**Duration:** {task.estimated_duration} hours")
-                    if task.deadline:
-                        st.markdown(f"**Deadline:** {task.deadline.strftime('%Y-%m-%d %H:%M')}")
-                    if task.tags:
-                        st.markdown(f"**Tags:** {', '.join(task.tags)}")
-
-                    st.markdown(f"**Preferences:**")
-                    st.markdown(f"- Deep Focus Required: {'Yes' if task.requires_deep_focus else 'No'}")
-                    st.markdown(f"- Can Split: {'Yes' if task.can_split else 'No'}")
-
-                    # Action buttons
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        if task.status.value == "pending" and st.button("▶️ Start", key=f"start_{task.id}"):
-                            agent.mark_task_in_progress(task.id)
-                            st.rerun()
-                    with col2:
-                        if task.status.value != "completed" and st.button("✅ Complete", key=f"complete_{task.id}"):
-                            agent.mark_task_completed(task.id)
-                            st.rerun()
-        else:
-            st.info("No tasks found. Add your first task above!")
+    st.markdown("---")
 
-    # ==================== SCHEDULE PAGE ====================
-    elif page == "🗓️ Schedule":
-        st.title("🗓️ Weekly Schedule Management")
-        st.markdown("Share your weekly schedule through conversation and visualize your plans.")
+    # Weekly review section
+    st.subheader("📝 Weekly Review")
+    st.markdown("At the end of the week, share what you actually did vs what was planned.")
 
-        # Schedule input section
-        st.subheader("📥 Update Your Weekly Schedule")
-        st.markdown("Tell me about your weekly schedule in natural language. Include meetings, commitments, and any fixed time blocks.")
+    with st.expander("📋 Record What You Actually Did"):
+        with st.form("completion_record_form"):
+            st.markdown("Tell me about what you actually accomplished this week, even if it differed from the plan.")
 
-        with st.form("schedule_input_form"):
-            schedule_text = st.text_area(
-                "Describe your schedule for this week",
+            completion_text = st.text_area(
+                "What did you actually do?",
                 placeholder="""Example:
-Monday: Team meeting 9-10am, lunch 12-1pm, client call 3-4pm
-Tuesday: Free morning, workshop 2-5pm
-Wednesday: All day conference
-Thursday: Morning meetings 9-11am, afternoon free
-Friday: Sprint planning 10-11am, rest of day flexible
-Weekend: Personal time, no work""",
+Monday: Completed the team meeting as planned, but the client call got rescheduled
+Tuesday: Attended workshop but only until 3pm due to urgent issue
+Wednesday: Conference went well, learned a lot about new frameworks
+Thursday: Morning meetings ran long until noon, worked on project in afternoon
+Friday: Sprint planning was productive, spent afternoon on documentation
+Weekend: Did some light work on Saturday morning""",
                 height=200
             )
 
-            week_start_date = st.date_input(
-                "Week starting from",
-                value=datetime.now().date() - timedelta(days=datetime.now().weekday())
+            week_review_date = st.date_input(
+                "Week ending",
+                value=now.date()
             )
 
-            submit_schedule = st.form_submit_button("💾 Update Schedule", use_container_width=True)
+            submit_review = st.form_submit_button("💾 Record Completion", use_container_width=True)
 
-            if submit_schedule and schedule_text:
+            if submit_review and completion_text:
                 try:
-                    week_start = datetime.combine(week_start_date, datetime.min.time())
-                    result = agent.update_schedule(schedule_text, week_start)
-                    st.success(f"✅ {result['message']}")
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Error updating schedule: {e}")
+                    # Same chat window as the chat page, taken before the review is added to it
+                    context = _context_for_llm(st.session_state.chat_history)
 
-        st.markdown("---")
+                    # Store the review for learning
+                    _append_chat("user", f"Weekly Review for week ending {week_review_date}:\n\n{completion_text}")
 
-        # Schedule visualization section
-        st.subheader("📊 Current Schedule View")
+                    # Get AI feedback, streamed as it is generated
+                    st.markdown("### AI Feedback:")
+                    response = st.write_stream(agent.ai_planner.chat_stream(
+                        f"I'm sharing my weekly review. Please analyze what I actually did vs what might have been planned, and help me learn from this:\n\n{completion_text}",
+                        context=context
+                    ))
 
-        col1, col2 = st.columns([2, 1])
+                    _append_chat("assistant", response)
 
-        with col1:
-            # Get schedule summary
-            try:
-                summary = agent.get_schedule_summary(days=7)
-                st.markdown(summary)
-            except Exception as e:
-                st.info("No schedule data available. Update your schedule above.")
+                    st.success("✅ Weekly review recorded!")
 
-        with col2:
-            st.subheader("Quick Stats")
-            try:
-                from datetime import datetime, timedelta
-                start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-                events = agent.calendar_service.get_events(start, start + timedelta(days=7))
+                except Exception as e:
+                    st.error(f"Error recording review: {e}")
 
-                st.metric("Scheduled Events", len(events))
-                st.metric("This Week", f"{start.strftime('%b %d')} - {(start + timedelta(days=6)).strftime('%b %d')}")
-
-            except Exception as e:
-                st.info("Add schedule data to see stats")
 
+# ==================== PLANNING PAGE ====================
+@st.fragment
+def _render_current_plan(agent):
+    """Current plan and its actions; Execute, Refine and Clear rerun only this section"""
+    if st.session_state.current_plan:
         st.markdown("---")
+        st.subheader("📋 Current Plan")
 
-        # Weekly review section
-        st.subheader("📝 Weekly Review")
-        st.markdown("At the end of the week, share what you actually did vs what was planned.")
+        plan = st.session_state.current_plan
 
-        with st.expander("📋 Record What You Actually Did"):
-            with st.form("completion_record_form"):
-                st.markdown("Tell me about what you actually accomplished this week, even if it differed from the plan.")
+        # Plan metadata
+        col1, col2 = st.columns(2)
+        with col1:
+            st.info(f"**Reasoning:** {plan.get('reasoning', 'N/A')}")
+        with col2:
+            if plan.get('warnings'):
+                st.warning(f"**Warnings:** {', '.join(plan['warnings'])}")
 
-                completion_text = st.text_area(
-                    "What did you actually do?",
-                    placeholder="""Example:
-Monday: Completed the team meeting as planned, but the client call got rescheduled
-Tuesday: Attended workshop but only until 3pm due to urgent issue
-Wednesday: Conference went well, learned a lot about new frameworks
-Thursday: Morning meetings ran long until noon, worked on project in afternoon
-Friday: Sprint planning was productive, spent afternoon on documentation
-Weekend: Did some light work on Saturday morning""",
-                    height=200
-                )
+        if plan.get('suggestions'):
+            st.success(f"**Suggestions:** {', '.join(plan['suggestions'])}")
 
-                week_review_date = st.date_input(
-                    "Week ending",
-                    value=datetime.now().date()
-                )
+        # Scheduled tasks
+        st.markdown("### Scheduled Tasks")
+
+        if plan.get('scheduled_tasks'):
+            for idx, scheduled in enumerate(plan['scheduled_tasks'], 1):
+                start_label = scheduled['_start_dt'].strftime("%Y-%m-%d %H:%M")
+                end_label = scheduled['_end_dt'].strftime("%Y-%m-%d %H:%M")
+                with st.expander(f"{idx}. {scheduled['title']} - {start_label}"):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.markdown(f"**Start:** {start_label}")
+                        st.markdown(f"**End:** {end_label}")
+                        st.markdown(f"**Duration:** {scheduled['duration_hours']} hours")
+                    with col2:
+                        st.markdown(f"**Task ID:** `{scheduled['task_id']}`")
+                        if scheduled.get('split_session'):
+                            st.markdown(f"**Session:** {scheduled['split_session']} of {scheduled['total_sessions']}")
 
-                submit_review = st.form_submit_button("💾 Record Completion", use_container_width=True)
+                    st.markdown(f"**Rationale:** {scheduled['rationale']}")
 
-                if submit_review and completion_text:
-                    try:
-                        # Store the review for learning
-                        st.session_state.chat_history.append({
-                            "role": "user",
-                            "content": f"Weekly Review for week ending {week_review_date}:\n\n{completion_text}"
-                        })
+        # Action buttons; Execute and Refine run in the background while a job is pending
+        st.markdown("---")
+        busy = st.session_state.plan_job is not None
+        col1, col2, col3 = st.columns(3)
 
-                        # Get AI feedback
-                        response = agent.ai_planner.chat(
-                            f"I'm sharing my weekly review. Please analyze what I actually did vs what might have been planned, and help me learn from this:\n\n{completion_text}"
-                        )
+        with col1:
+            if st.button("🚀 Execute Plan (Add to Calendar)", use_container_width=True, disabled=busy):
+                st.session_state.plan_job = ("execute", _get_executor().submit(agent.execute_plan, plan), plan)
 
-                        st.session_state.chat_history.append({
-                            "role": "assistant",
-                            "content": response
-                        })
+        with col2:
+            with st.form("refine_plan_form", clear_on_submit=False):
+                feedback = st.text_area("Provide feedback for refinement", height=100,
+                                       placeholder="E.g., 'Move deep work to mornings' or 'Need Wednesday afternoon free'")
+                refine = st.form_submit_button("🔄 Refine Plan", use_container_width=True, disabled=busy)
+            if refine and feedback:
+                st.session_state.plan_job = ("refine", _get_executor().submit(_refine_and_record, agent, feedback, plan), plan)
 
-                        st.success("✅ Weekly review recorded!")
-                        st.markdown("### AI Feedback:")
-                        st.markdown(response)
+        with col3:
+            st.button("🗑️ Clear Plan", use_container_width=True, on_click=_clear_plan)
 
-                    except Exception as e:
-                        st.error(f"Error recording review: {e}")
+    # Polled even after the plan is cleared, so a pending job always finishes
+    if st.session_state.plan_job is not None:
+        _render_plan_job()
 
-    # ==================== PLANNING PAGE ====================
-    elif page == "📅 Planning":
-        st.title("📅 AI Planning & Execution")
+    notice = st.session_state.pop("plan_notice", None)
+    if notice:
+        level, message = notice
+        getattr(st, level)(message)
 
-        st.subheader("Generate Optimal Schedule")
 
-        with st.form("planning_form"):
-            col1, col2 = st.columns(2)
+@st.fragment(run_every=0.5)
+def _render_plan_job():
+    """Progress of a background Execute or Refine; reruns the app once the job has finished"""
+    kind, future, plan = st.session_state.plan_job
+    if not future.done():
+        if kind == "execute":
+            st.info("⏳ Executing plan and adding to calendar...")
+        else:
+            st.info("⏳ Refining plan based on your feedback...")
+        return
 
-            with col1:
-                start_date = st.date_input("Start Date", value=datetime.now().date())
-                start_time = st.time_input("Start Time", value=datetime.now().time())
+    st.session_state.plan_job = None
+    try:
+        result = future.result()
+    except Exception as e:
+        action = "executing" if kind == "execute" else "refining"
+        st.session_state.plan_notice = ("error", f"Error {action} plan: {e}")
+    else:
+        if kind == "execute":
+            _invalidate_task_caches()
+            _get_cache_versions().bump(st.session_state.user_id, "schedule")
+            st.session_state.plan_notice = ("success", f"✅ Added {len(result)} events to calendar!")
+        else:
+            _get_cache_versions().bump(st.session_state.user_id, "insights")
+            refined = _with_parsed_times(result)
+            if st.session_state.current_plan is not plan:
+                # The plan was cleared or replaced while this refinement ran
+                st.session_state.plan_notice = ("success", "✅ Feedback saved.")
+            elif refined != plan:
+                st.session_state.current_plan = refined
+                st.session_state.plan_notice = ("success", "✅ Plan refined!")
+            else:
+                st.session_state.plan_notice = ("success", "✅ Feedback saved; the plan is unchanged.")
+    st.rerun()
 
-            with col2:
-                end_date = st.date_input("End Date", value=(datetime.now() + timedelta(days=14)).date())
-                end_time = st.time_input("End Time", value=datetime.now().time())
 
-            context = st.text_area(
-                "Additional Context (Optional)",
-                placeholder="e.g., 'Focus on urgent tasks first', 'Avoid scheduling on weekends', etc."
-            )
+@st.fragment
+def _planning_page(agent):
+    now = datetime.now()
+    st.title("📅 AI Planning & Execution")
 
-            generate = st.form_submit_button("🧠 Generate Plan", use_container_width=True)
+    st.subheader("Generate Optimal Schedule")
 
-            if generate:
-                with st.spinner("AI is generating your optimal schedule..."):
-                    try:
-                        start_dt = datetime.combine(start_date, start_time)
-                        end_dt = datetime.combine(end_date, end_time)
+    with st.form("planning_form"):
+        col1, col2 = st.columns(2)
 
-                        plan = agent.generate_plan(
-                            start_date=start_dt,
-                            end_date=end_dt,
-                            context=context if context else None
-                        )
+        with col1:
+            start_date = st.date_input("Start Date", value=now.date())
+            start_time = st.time_input("Start Time", value=now.time())
 
-                        st.session_state.current_plan = plan
-                        st.success("✅ Plan generated successfully!")
-                        st.rerun()
+        with col2:
+            end_date = st.date_input("End Date", value=(now + timedelta(days=14)).date())
+            end_time = st.time_input("End Time", value=now.time())
 
-                    except Exception as e:
-                        st.error(f"Error generating plan: {e}")
-                        st.code(traceback.format_exc())
+        context = st.text_area(
+            "Additional Context (Optional)",
+            placeholder="e.g., 'Focus on urgent tasks first', 'Avoid scheduling on weekends', etc."
+        )
 
-        # Display current plan
-        if st.session_state.current_plan:
-            st.markdown("---")
-            st.subheader("📋 Current Plan")
+        generate = st.form_submit_button("🧠 Generate Plan", use_container_width=True)
 
-            plan = st.session_state.current_plan
+        if generate:
+            with st.spinner("AI is generating your optimal schedule..."):
+                try:
+                    start_dt = datetime.combine(start_date, start_time)
+                    end_dt = datetime.combine(end_date, end_time)
 
-            # Plan metadata
-            col1, col2 = st.columns(2)
-            with col1:
-                st.info(f"**Reasoning:** {plan.get('reasoning', 'N/A')}")
-            with col2:
-                if plan.get('warnings'):
-                    st.warning(f"**Warnings:** {', '.join(plan['warnings'])}")
-
-            if plan.get('suggestions'):
-                st.success(f"**Suggestions:** {', '.join(plan['suggestions'])}")
-
-            # Scheduled tasks
-            st.markdown("### Scheduled Tasks")
-
-            if plan.get('scheduled_tasks'):
-                for idx, scheduled in enumerate(plan['scheduled_tasks'], 1):
-                    with st.expander(f"{idx}. {scheduled['title']} - {scheduled['scheduled_start']}"):
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.markdown(f"**Start:** {scheduled['scheduled_start']}")
-                            st.markdown(f"**End:** {scheduled['scheduled_end']}")
-                            st.markdown(f"**Duration:** {scheduled['duration_hours']} hours")
-                        with col2:
-                            st.markdown(f"**Task ID:** `{scheduled['task_id']}`")
-                            if scheduled.get('split_session'):
-                                st.markdown(f"**Session:** {scheduled['split_session']} of {scheduled['total_sessions']}")
-
-                        st.markdown(f"**Rationale:** {scheduled['rationale']}")
-
-            # Action buttons
-            st.markdown("---")
-            col1, col2, col3 = st.columns(3)
+                    plan = agent.generate_plan(
+                        start_date=start_dt,
+                        end_date=end_dt,
+                        context=context if context else None
+                    )
 
-            with col1:
-                if st.button("🚀 Execute Plan (Add to Calendar)", use_container_width=True):
-                    with st.spinner("Executing plan and adding to calendar..."):
-                        try:
-                            events = agent.execute_plan(plan)
-                            st.success(f"✅ Added {len(events)} events to calendar!")
-                        except Exception as e:
-                            st.error(f"Error executing plan: {e}")
+                    # The plan section below reads current_plan in this same pass
+                    st.session_state.current_plan = _with_parsed_times(plan)
+                    st.success("✅ Plan generated successfully!")
 
-            with col2:
-                feedback = st.text_area("Provide feedback for refinement", height=100,
-                                       placeholder="E.g., 'Move deep work to mornings' or 'Need Wednesday afternoon free'")
-                if st.button("🔄 Refine Plan", use_container_width=True) and feedback:
-                    with st.spinner("Refining plan based on your feedback..."):
-                        try:
-                            # Save the refinement request to database for learning
-                            agent.db.save_plan_refinement(
-                                user_id=agent.user_id,
-                                original_plan=plan if isinstance(plan, dict) else {"plan": str(plan)},
-                                refinement_request=feedback,
-                                plan_date=datetime.now()
-                            )
-
-                            # Refine the plan
-                            refined = agent.refine_plan(feedback, plan)
-
-                            # Update the saved refinement with the refined plan
-                            refinements = agent.db.get_plan_refinements(agent.user_id, limit=1)
-                            if refinements:
-                                # Note: Would need update method, for now just save a new complete record
-                                pass
-
-                            st.session_state.current_plan = refined
-                            st.success("✅ Plan refined and feedback saved!")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Error refining plan: {e}")
+                except Exception as e:
+                    st.error(f"Error generating plan: {e}")
+                    details = _debug_traceback()
+                    if details:
+                        st.code(details)
 
-            with col3:
-                if st.button("🗑️ Clear Plan", use_container_width=True):
-                    st.session_state.current_plan = None
-                    st.rerun()
+    # Display current plan
+    _render_current_plan(agent)
 
-    # ==================== INSIGHTS PAGE ====================
-    elif page == "📊 Insights":
-        st.title("📊 Productivity Insights & Analytics")
 
-        try:
-            insights = agent.get_insights()
+# ==================== INSIGHTS PAGE ====================
+@st.fragment
+def _insights_page(agent):
+    st.title("📊 Productivity Insights & Analytics")
+    st.button("🔄 Refresh insights", on_click=_refresh_insights)
+    version = _get_cache_versions().get(st.session_state.user_id, "insights")
 
-            # Metrics
-            st.subheader("Key Metrics")
-            col1, col2, col3, col4 = st.columns(4)
+    try:
+        insights, insights_json = _cached_insights(st.session_state.user_id, version)
+
+        # Metrics
+        st.subheader("Key Metrics")
+        metrics = [
+            ("Total Tasks", insights.get("total_tasks", 0)),
+            ("Completed", insights.get("completed_tasks", 0)),
+            ("Completion Rate", f"{insights.get('completion_rate', 0):.1f}%"),
+            ("Avg Task Duration", f"{insights.get('average_task_duration', 0):.1f}h"),
+        ]
+        for col, (label, value) in zip(st.columns(len(metrics)), metrics):
+            col.metric(label, value)
+
+        # Detailed insights
+        st.markdown("---")
+        st.subheader("Detailed Analysis")
 
-            with col1:
-                st.metric(
-                    "Total Tasks",
-                    insights.get("total_tasks", 0)
-                )
-            with col2:
-                st.metric(
-                    "Completed",
-                    insights.get("completed_tasks", 0)
-                )
-            with col3:
-                completion_rate = insights.get("completion_rate", 0)
-                st.metric(
-                    "Completion Rate",
-                    f"{completion_rate:.1f}%"
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("### Task Distribution by Priority")
+            if insights.get("tasks_by_priority"):
+                st.dataframe(
+                    [{"Priority": priority.upper(), "Tasks": count}
+                     for priority, count in insights["tasks_by_priority"].items()],
+                    hide_index=True,
+                    use_container_width=True
                 )
-            with col4:
-                st.metric(
-                    "Avg Task Duration",
-                    f"{insights.get('average_task_duration', 0):.1f}h"
+            else:
+                st.info("No priority data available")
+
+        with col2:
+            st.markdown("### Task Distribution by Status")
+            if insights.get("tasks_by_status"):
+                st.dataframe(
+                    [{"Status": status.title(), "Tasks": count}
+                     for status, count in insights["tasks_by_status"].items()],
+                    hide_index=True,
+                    use_container_width=True
                 )
+            else:
+                st.info("No status data available")
 
-            # Detailed insights
-            st.markdown("---")
-            st.subheader("Detailed Analysis")
+        # Plan Refinement Patterns
+        st.markdown("---")
+        st.subheader("🔄 Your Planning Preferences")
 
+        refinement_analysis = _cached_refinement_patterns(agent.user_id, version)
+
+        if refinement_analysis["total_refinements"] > 0:
             col1, col2 = st.columns(2)
 
             with col1:
-                st.markdown("### Task Distribution by Priority")
-                if insights.get("tasks_by_priority"):
-                    for priority, count in insights["tasks_by_priority"].items():
-                        st.write(f"**{priority.upper()}:** {count} tasks")
-                else:
-                    st.info("No priority data available")
+                st.metric("Total Plan Refinements", refinement_analysis["total_refinements"])
+
+                st.markdown("### Common Feedback Patterns")
+                st.dataframe(
+                    [{"Category": p["category"].title(), "Count": p["count"], "Share": p["percentage"]}
+                     for p in refinement_analysis["patterns"]],
+                    hide_index=True,
+                    use_container_width=True,
+                    column_config={"Share": st.column_config.NumberColumn("Share", format="%.1f%%")}
+                )
 
             with col2:
-                st.markdown("### Task Distribution by Status")
-                if insights.get("tasks_by_status"):
-                    for status, count in insights["tasks_by_status"].items():
-                        st.write(f"**{status.title()}:** {count} tasks")
-                else:
-                    st.info("No status data available")
-
-            # Plan Refinement Patterns
-            st.markdown("---")
-            st.subheader("🔄 Your Planning Preferences")
+                st.markdown("### Recent Refinement Requests")
+                st.dataframe(
+                    [{"Request": request} for request in refinement_analysis["recent_requests"]],
+                    hide_index=True,
+                    use_container_width=True
+                )
 
-            refinement_analysis = agent.db.analyze_refinement_patterns(agent.user_id)
+            st.markdown("""
+            **What this means:** The agent learns from your refinement requests to better understand your preferences.
+            Over time, initial plans will better match your needs!
+            """)
+        else:
+            st.info("No plan refinements yet. When you refine plans, the agent will learn your preferences!")
 
-            if refinement_analysis["total_refinements"] > 0:
-                col1, col2 = st.columns(2)
+        # Recommendations
+        if insights.get("recommendations"):
+            st.markdown("---")
+            st.subheader("🎯 AI Recommendations")
+            for rec in insights["recommendations"]:
+                st.success(rec)
 
-                with col1:
-                    st.metric("Total Plan Refinements", refinement_analysis["total_refinements"])
+        # Raw insights
+        with st.expander("📄 View Raw Insights Data"):
+            st.json(insights_json)
 
-                    st.markdown("### Common Feedback Patterns")
-                    for pattern in refinement_analysis["patterns"]:
-                        st.write(f"**{pattern['category'].title()}**: {pattern['count']} times ({pattern['percentage']}%)")
+    except Exception as e:
+        st.error(f"Error loading insights: {e}")
+        details = _debug_traceback()
+        if details:
+            st.code(details)
 
-                with col2:
-                    st.markdown("### Recent Refinement Requests")
-                    for i, request in enumerate(refinement_analysis["recent_requests"], 1):
-                        st.info(f"{i}. {request}")
 
-                st.markdown("""
-                **What this means:** The agent learns from your refinement requests to better understand your preferences.
-                Over time, initial plans will better match your needs!
-                """)
-            else:
-                st.info("No plan refinements yet. When you refine plans, the agent will learn your preferences!")
 
-            # Recommendations
-            if insights.get("recommendations"):
-                st.markdown("---")
-                st.subheader("🎯 AI Recommendations")
-                for rec in insights["recommendations"]:
-                    st.success(rec)
+# Main content area
+if not st.session_state.configured:
+    # Welcome screen
+    st.title("Welcome to AI Task Planning Agent 🤖")
+    st.markdown(_WELCOME_MD)
 
-            # Raw insights
-            with st.expander("📄 View Raw Insights Data"):
-                st.json(insights)
+else:
+    agent = st.session_state.agent
 
-        except Exception as e:
-            st.error(f"Error loading insights: {e}")
-            st.code(traceback.format_exc())
+    if page == "💬 Chat":
+        _chat_page(agent)
+    elif page == "📝 Tasks":
+        _tasks_page(agent)
+    elif page == "🗓️ Schedule":
+        _schedule_page(agent)
+    elif page == "📅 Planning":
+        _planning_page(agent)
+    elif page == "📊 Insights":
+        _insights_page(agent)
 
 # Footer
 st.markdown("---")
@@ -1,25 +1,30 @@
 """Utilities module."""
 
-from .helpers import (
-    parse_time_string,
-    parse_date_string,
-    get_business_hours,
-    is_business_hours,
-    calculate_available_hours,
-    format_duration,
-    get_time_of_day,
-    find_next_available_slot,
-    convert_timezone,
-)
+from importlib import import_module
 
-__all__ = [
-    "parse_time_string",
-    "parse_date_string",
-    "get_business_hours",
-    "is_business_hours",
-    "calculate_available_hours",
-    "format_duration",
-    "get_time_of_day",
-    "find_next_available_slot",
-    "convert_timezone",
-]
+# Exported name -> submodule defining it, imported on first access (PEP 562)
+_EXPORTS = {
+    "parse_time_string": ".helpers",
+    "parse_date_string": ".helpers",
+    "get_business_hours": ".helpers",
+    "is_business_hours": ".helpers",
+    "calculate_available_hours": ".helpers",
+    "format_duration": ".helpers",
+    "get_time_of_day": ".helpers",
+    "find_next_available_slot": ".helpers",
+    "convert_timezone": ".helpers",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,10 +1,33 @@
 """Utility helper functions."""
 
+import re
 from datetime import datetime, time, timedelta
-from typing import List, Tuple
-import pytz
-
-
+from functools import lru_cache
+from typing import Iterator, List, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+# strptime fallbacks, tried in order after the ISO parsers
+_TIME_FORMATS = ("%H:%M", "%H:%M:%S", "%I:%M %p")
+_DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d %H:%M:%S",
+)
+# Zero-padded strings in the ISO-shaped formats above; only these take the fromisoformat shortcut
+_ISO_DATE_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}(?: [0-9]{2}:[0-9]{2}(?::[0-9]{2})?)?")
+
+# find_next_available_slot looks at most this many days ahead
+_MAX_SEARCH_DAYS = 60
+# Gap kept after a busy slot before a task can start
+_BUSY_BUFFER = timedelta(minutes=15)
+
+
+@lru_cache(maxsize=4096)
 def parse_time_string(time_str: str) -> time:
     """
     Parse a time string to time object.
@@ -19,7 +42,7 @@ def parse_time_string(time_str: str) -> time:
         return time.fromisoformat(time_str)
     except ValueError:
         # Try parsing with strptime
-        for fmt in ["%H:%M", "%H:%M:%S", "%I:%M %p"]:
+        for fmt in _TIME_FORMATS:
             try:
                 dt = datetime.strptime(time_str, fmt)
                 return dt.time()
@@ -28,6 +51,7 @@ def parse_time_string(time_str: str) -> time:
         raise ValueError(f"Could not parse time string: {time_str}")
 
 
+@lru_cache(maxsize=4096)
 def parse_date_string(date_str: str) -> datetime:
     """
     Parse a date string to datetime object.
@@ -38,14 +62,14 @@ def parse_date_string(date_str: str) -> datetime:
     Returns:
         datetime object
     """
-    for fmt in [
-        "%Y-%m-%d",
-        "%Y/%m/%d",
-        "%m/%d/%Y",
-        "%d/%m/%Y",
-        "%Y-%m-%d %H:%M",
-        "%Y-%m-%d %H:%M:%S",
-    ]:
+    # fromisoformat alone would also accept offsets (aware results) and compact forms
+    if _ISO_DATE_RE.fullmatch(date_str):
+        try:
+            return datetime.fromisoformat(date_str)
+        except ValueError:
+            pass
+
+    for fmt in _DATE_FORMATS:
         try:
             return datetime.strptime(date_str, fmt)
         except ValueError:
@@ -129,26 +153,18 @@ def calculate_available_hours(
     end_minutes = working_hours_end.hour * 60 + working_hours_end.minute
     hours_per_day = (end_minutes - start_minutes) / 60
 
-    total_hours = 0.0
-    current_date = start_date.date()
+    start = start_date.date()
     end = end_date.date()
+    if end < start:
+        return 0.0
 
-    while current_date <= end:
-        # Skip excluded dates
-        if any(current_date == ex.date() for ex in exclude_dates):
-            current_date += timedelta(days=1)
-            continue
-
-        # Skip weekends if not allowed
-        weekday = datetime.combine(current_date, time()).weekday()
-        if not allow_weekends and weekday >= 5:
-            current_date += timedelta(days=1)
-            continue
+    # Count the working days in [start, end] in one call; busday_count excludes its end date
+    excluded = frozenset(ex.date() for ex in exclude_dates)
+    holidays = np.array(sorted(excluded), dtype='datetime64[D]')
+    weekmask = '1111111' if allow_weekends else '1111100'
+    working_days = np.busday_count(start, end + timedelta(days=1), weekmask=weekmask, holidays=holidays)
 
-        total_hours += hours_per_day
-        current_date += timedelta(days=1)
-
-    return total_hours
+    return float(working_days) * hours_per_day
 
 
 def format_duration(hours: float) -> str:
@@ -217,61 +233,73 @@ def find_next_available_slot(
     Returns:
         Tuple of (slot_start, slot_end) or (None, None) if no slot found
     """
-    current_time = start_time
-    max_search_days = 60  # Don't search more than 60 days ahead
-    search_end = start_time + timedelta(days=max_search_days)
-
-    # Sort busy slots
-    busy_slots = sorted(busy_slots, key=lambda x: x[0])
-
-    while current_time < search_end:
-        # Ensure we're in business hours
-        if not is_business_hours(current_time, working_hours_start, working_hours_end, allow_weekends):
-            # Move to next business day start
-            current_time = current_time.replace(
-                hour=working_hours_start.hour,
-                minute=working_hours_start.minute,
-                second=0
-            )
-            if current_time.weekday() >= 5 and not allow_weekends:
-                # Move to Monday
-                days_ahead = 7 - current_time.weekday()
-                current_time += timedelta(days=days_ahead)
-            else:
-                current_time += timedelta(days=1)
+    duration = timedelta(hours=duration_hours)
+    search_end = start_time + timedelta(days=_MAX_SEARCH_DAYS)
+
+    # Merge the busy slots, each followed by a short buffer, into sorted disjoint intervals
+    busy = []
+    for busy_start, busy_end in sorted(busy_slots, key=lambda x: x[0]):
+        if busy_end <= busy_start:
             continue
+        busy_end += _BUSY_BUFFER
+        if busy and busy_start <= busy[-1][1]:
+            busy[-1][1] = max(busy[-1][1], busy_end)
+        else:
+            busy.append([busy_start, busy_end])
+
+    # Sweep the working-hours windows and the busy intervals together; both run forward in time
+    i = 0
+    windows = _business_windows(start_time, working_hours_start, working_hours_end, allow_weekends)
+    for window_start, window_end in windows:
+        free_start = window_start
+        while free_start < window_end and free_start < search_end:
+            # Busy intervals that are over by free_start no longer matter
+            while i < len(busy) and busy[i][1] <= free_start:
+                i += 1
+
+            gap_end = min(busy[i][0], window_end) if i < len(busy) else window_end
+            if gap_end - free_start >= duration:
+                # Found a slot!
+                return free_start, free_start + duration
+
+            if i == len(busy) or busy[i][0] >= window_end:
+                break
+            free_start = busy[i][1]
 
-        # Calculate potential end time
-        potential_end = current_time + timedelta(hours=duration_hours)
+    # No slot found
+    return None, None
 
-        # Check if slot extends beyond working hours
-        if potential_end.time() > working_hours_end:
-            # Move to next day
-            current_time = current_time.replace(
-                hour=working_hours_start.hour,
-                minute=working_hours_start.minute
-            ) + timedelta(days=1)
-            continue
 
-        # Check for conflicts with busy slots
-        conflict = False
-        for busy_start, busy_end in busy_slots:
-            # Check if there's overlap
-            if current_time < busy_end and potential_end > busy_start:
-                conflict = True
-                # Move current_time to after this busy slot
-                current_time = busy_end
-                break
+def _business_windows(
+    start_time: datetime,
+    working_hours_start: time,
+    working_hours_end: time,
+    allow_weekends: bool
+) -> Iterator[Tuple[datetime, datetime]]:
+    """
+    Yield each day's working-hours window from start_time onwards.
 
-        if not conflict:
-            # Found a slot!
-            return current_time, potential_end
+    The first window is clipped to begin no earlier than start_time.
+    """
+    day = start_time.date()
+    last_day = day + timedelta(days=_MAX_SEARCH_DAYS)
+    while day <= last_day:
+        weekday = day.weekday()
+        if not allow_weekends and weekday >= 5:
+            # Saturday or Sunday: jump straight to Monday
+            day += timedelta(days=7 - weekday)
+            continue
 
-        # Move forward a bit
-        current_time += timedelta(minutes=15)
+        window_start = datetime.combine(day, working_hours_start, tzinfo=start_time.tzinfo)
+        window_end = datetime.combine(day, working_hours_end, tzinfo=start_time.tzinfo)
+        yield max(window_start, start_time), window_end
+        day += timedelta(days=1)
 
-    # No slot found
-    return None, None
+
+@lru_cache(maxsize=128)
+def _zone(name: str) -> ZoneInfo:
+    """Look up a timezone by name once."""
+    return ZoneInfo(name)
 
 
 def convert_timezone(
@@ -290,11 +318,11 @@ def convert_timezone(
     Returns:
         Converted datetime
     """
-    from_zone = pytz.timezone(from_tz)
-    to_zone = pytz.timezone(to_tz)
-
-    # Localize if naive
+    # Attach the source zone if naive. A wall time that occurs twice (or never)
+    # around a DST change resolves to standard time, as pytz's localize() did.
     if dt.tzinfo is None:
-        dt = from_zone.localize(dt)
+        dt = dt.replace(tzinfo=_zone(from_tz))
+        if dt.dst() > timedelta(0) and not dt.replace(fold=1).dst():
+            dt = dt.replace(fold=1)
 
-    return dt.astimezone(to_zone)
+    return dt.astimezone(_zone(to_tz))